@@ -0,0 +1,269 @@
+#!/usr/bin/env python
+"""
+Attendance Analytics Module for Attendance System
+Columnar snapshot of all attendance and vectorized reports over it
+
+export_snapshot() reads the live database and the term archives once and
+writes each column as a .npy file:
+
+    student      int32   index into student_ids.npy
+    section      int32   index into section_ids.npy
+    status       uint8   index into STATUSES
+    day          int32   days since 1970-01-01
+    time_in      int32   seconds after midnight, -1 if not recorded
+
+plus per-student department codes and a meta.json with the dictionaries.
+Reports load the columns memory-mapped and never touch the transactional
+database, so they can run while scans are being written.
+
+Usage:
+  python analytics.py export
+  python analytics.py report
+"""
+
+import json
+import os
+import shutil
+import sqlite3
+import sys
+import time
+
+import numpy as np
+
+STATUSES = ('present', 'late', 'absent', 'other')
+PRESENT, LATE, ABSENT, OTHER = range(len(STATUSES))
+
+
+# ============ EXPORT ============
+
+def _read_attendance(path):
+    conn = sqlite3.connect(f'file:{path}?mode=ro', uri=True)
+    try:
+        return conn.execute(
+            "SELECT student_id, section_id, lower(status), date, time_in FROM attendance").fetchall()
+    finally:
+        conn.close()
+
+
+def _seconds(time_in):
+    if not time_in:
+        return -1
+    return int(time_in[0:2]) * 3600 + int(time_in[3:5]) * 60 + int(time_in[6:8])
+
+
+def export_snapshot(db_path, archive_dir, snapshot_dir):
+    """
+    Write a columnar snapshot of all attendance
+
+    Args:
+        db_path: Path of the live SQLite database
+        archive_dir: Directory holding the per-term archive files
+        snapshot_dir: Directory the snapshot replaces
+
+    Returns:
+        int: Number of attendance rows exported
+    """
+    rows = _read_attendance(db_path)
+    if os.path.isdir(archive_dir):
+        for filename in sorted(os.listdir(archive_dir)):
+            if filename.startswith('attendance_') and filename.endswith('.db'):
+                rows.extend(_read_attendance(os.path.join(archive_dir, filename)))
+
+    conn = sqlite3.connect(f'file:{db_path}?mode=ro', uri=True)
+    try:
+        student_departments = dict(conn.execute("SELECT id, department FROM student").fetchall())
+    finally:
+        conn.close()
+
+    if rows:
+        student_raw, section_raw, status_raw, day_raw, time_raw = zip(*rows)
+    else:
+        student_raw = section_raw = status_raw = day_raw = time_raw = ()
+
+    # Dictionary-encode students and sections
+    student_ids, student = np.unique(np.array(student_raw, dtype=np.int64), return_inverse=True)
+    section_ids, section = np.unique(np.array(section_raw, dtype=np.int64), return_inverse=True)
+
+    status_codes = {name: code for code, name in enumerate(STATUSES)}
+    status = np.array([status_codes.get(s, OTHER) for s in status_raw], dtype=np.uint8)
+    day = np.array(day_raw, dtype='datetime64[D]').astype(np.int32)
+    time_in = np.array([_seconds(t) for t in time_raw], dtype=np.int32)
+
+    departments = sorted({d or 'Unassigned' for d in student_departments.values()} | {'Unassigned'})
+    department_codes = {name: code for code, name in enumerate(departments)}
+    student_department = np.array(
+        [department_codes[student_departments.get(int(i)) or 'Unassigned'] for i in student_ids],
+        dtype=np.int16)
+
+    # Write next to the old snapshot, then swap it in
+    tmp_dir = f'{snapshot_dir}.tmp'
+    shutil.rmtree(tmp_dir, ignore_errors=True)
+    os.makedirs(tmp_dir)
+
+    columns = {
+        'student': student.astype(np.int32),
+        'section': section.astype(np.int32),
+        'status': status,
+        'day': day,
+        'time_in': time_in,
+        'student_ids': student_ids,
+        'section_ids': section_ids,
+        'student_department': student_department,
+    }
+    for name, values in columns.items():
+        np.save(os.path.join(tmp_dir, f'{name}.npy'), values)
+
+    with open(os.path.join(tmp_dir, 'meta.json'), 'w') as f:
+        json.dump({
+            'created_at': time.time(),
+            'rows': len(status),
+            'statuses': STATUSES,
+            'departments': departments,
+        }, f)
+
+    old_dir = f'{snapshot_dir}.old'
+    shutil.rmtree(old_dir, ignore_errors=True)
+    if os.path.isdir(snapshot_dir):
+        os.replace(snapshot_dir, old_dir)
+    os.replace(tmp_dir, snapshot_dir)
+    shutil.rmtree(old_dir, ignore_errors=True)
+
+    print(f"Exported {len(status)} attendance records to {snapshot_dir}")
+    return len(status)
+
+
+# ============ SNAPSHOT ============
+
+class AttendanceSnapshot:
+    """Memory-mapped columns of an exported snapshot"""
+
+    def __init__(self, snapshot_dir):
+        with open(os.path.join(snapshot_dir, 'meta.json')) as f:
+            self.meta = json.load(f)
+
+        def load(name):
+            return np.load(os.path.join(snapshot_dir, f'{name}.npy'), mmap_mode='r')
+
+        self.student = load('student')
+        self.section = load('section')
+        self.status = load('status')
+        self.day = load('day')
+        self.time_in = load('time_in')
+        self.student_ids = load('student_ids')
+        self.section_ids = load('section_ids')
+        self.student_department = load('student_department')
+        self.departments = self.meta['departments']
+
+    def __len__(self):
+        return len(self.status)
+
+    def between(self, start=None, end=None):
+        """Boolean mask of rows dated within [start, end]"""
+        mask = np.ones(len(self), dtype=bool)
+        if start is not None:
+            mask &= self.day >= np.datetime64(start, 'D').astype(np.int32)
+        if end is not None:
+            mask &= self.day <= np.datetime64(end, 'D').astype(np.int32)
+        return mask
+
+
+# ============ REPORTS ============
+
+def chronic_absentees(snapshot, threshold=0.2, min_records=5, start=None, end=None):
+    """
+    Students absent in at least `threshold` of their recorded sessions
+
+    Returns:
+        list: dicts with student_id, records, absences and absence_rate,
+              worst first
+    """
+    mask = snapshot.between(start, end)
+    student = snapshot.student[mask]
+    student_count = len(snapshot.student_ids)
+
+    records = np.bincount(student, minlength=student_count)
+    absences = np.bincount(student, weights=snapshot.status[mask] == ABSENT, minlength=student_count)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        rates = np.where(records > 0, absences / records, 0.0)
+
+    flagged = np.nonzero((records >= min_records) & (rates >= threshold))[0]
+    flagged = flagged[np.argsort(-rates[flagged])]
+
+    return [{
+        'student_id': int(snapshot.student_ids[i]),
+        'records': int(records[i]),
+        'absences': int(absences[i]),
+        'absence_rate': float(rates[i]),
+    } for i in flagged]
+
+
+def department_rates(snapshot, start=None, end=None):
+    """
+    Share of present, late and absent records per student department
+
+    Returns:
+        dict: {department: {'records': n, 'present': rate, 'late': rate, 'absent': rate}}
+    """
+    mask = snapshot.between(start, end)
+    department = snapshot.student_department[snapshot.student[mask]]
+    status = snapshot.status[mask]
+    count = len(snapshot.departments)
+
+    # One bincount over (department, status) pairs
+    pairs = np.bincount(department.astype(np.int64) * len(STATUSES) + status,
+                        minlength=count * len(STATUSES)).reshape(count, len(STATUSES))
+    totals = pairs.sum(axis=1)
+
+    report = {}
+    for code, name in enumerate(snapshot.departments):
+        if totals[code] == 0:
+            continue
+        report[name] = {'records': int(totals[code])}
+        for status_code, status_name in enumerate(STATUSES[:OTHER]):
+            report[name][status_name] = float(pairs[code, status_code] / totals[code])
+    return report
+
+
+def late_arrival_histogram(snapshot, bin_minutes=15, start=None, end=None):
+    """
+    Late arrivals counted by time of day
+
+    Returns:
+        list: (bin start as 'HH:MM', count) for every non-empty bin
+    """
+    mask = snapshot.between(start, end) & (snapshot.status == LATE) & (snapshot.time_in >= 0)
+    bins = snapshot.time_in[mask] // (bin_minutes * 60)
+    counts = np.bincount(bins, minlength=24 * 60 // bin_minutes)
+
+    return [(f"{b * bin_minutes // 60:02d}:{b * bin_minutes % 60:02d}", int(c))
+            for b, c in enumerate(counts) if c]
+
+
+def main():
+    from app import app
+    from database import db
+
+    command = sys.argv[1] if len(sys.argv) > 1 else 'report'
+    snapshot_dir = app.config['SNAPSHOT_DIR']
+
+    if command == 'export':
+        with app.app_context():
+            export_snapshot(db.engine.url.database, app.config['ARCHIVE_DIR'], snapshot_dir)
+        return 0
+
+    if command == 'report':
+        snapshot = AttendanceSnapshot(snapshot_dir)
+        print(json.dumps({
+            'rows': len(snapshot),
+            'chronic_absentees': chronic_absentees(snapshot),
+            'department_rates': department_rates(snapshot),
+            'late_arrivals': late_arrival_histogram(snapshot),
+        }, indent=2))
+        return 0
+
+    print(f"Unknown command: {command} (use 'export' or 'report')")
+    return 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
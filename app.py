@@ -1,7 +1,10 @@
 import os
 import pickle
 import base64
+import hashlib
 import json
+import math
+import time
 from datetime import datetime, timedelta
 from io import BytesIO
 
@@ -9,18 +12,40 @@ import cv2
 import numpy as np
 from PIL import Image
 
-from flask import Flask, render_template, request, jsonify, session, redirect, url_for
+from flask import Flask, Response, render_template, request, jsonify, session, redirect, url_for, send_from_directory, flash
 from flask_sqlalchemy import SQLAlchemy
 from functools import wraps
 
-from database import db, init_db, Teacher, Student, Section, Attendance
-import face_recognition
+from database import db, init_db, section_summaries, Teacher, Student, Section, Attendance
+import face_engine
+from metrics import metrics, instrument_route
+from recognition_jobs import RecognitionJobQueue
+import encoding_protocol
+from load_control import LoadController, CLASSROOM, KIOSK
+from archive import attendance_history, default_archive_dir, start_maintenance_scheduler
+from assets import AssetPipeline, conditional_page
+from recognition_service import ShardedGallery
+from profiler import profiler
+from attendance_marks import MarkCoalescer, IdempotencyKeyReused
 
 # Initialize Flask app
 app = Flask(__name__)
-app.config['SQLALCHEMY_DATABASE_URI'] = 'sqlite:///attendance_system.db'
+app.config['SQLALCHEMY_DATABASE_URI'] = os.environ.get('DATABASE_URL', 'sqlite:///attendance_system.db')
 app.config['SECRET_KEY'] = 'your-secret-key-change-this'
 app.config['SQLALCHEMY_TRACK_MODIFICATIONS'] = False
+app.config['FACE_TRACKING_ENABLED'] = True
+app.config['RECOGNITION_JOB_MAX_WAIT'] = 2  # seconds a poll may hold a worker thread
+app.config['KIOSK_IDS'] = None  # set of accepted kiosk ids, None accepts any
+app.config['KIOSK_MAX_CLOCK_SKEW'] = 30  # seconds
+app.config['ARCHIVE_DIR'] = os.environ.get('ARCHIVE_DIR') or default_archive_dir(
+    app.config['SQLALCHEMY_DATABASE_URI'], app.instance_path)
+# Local hour the nightly archiving and VACUUM window opens, None (or an
+# empty MAINTENANCE_HOUR) disables it
+app.config['MAINTENANCE_HOUR'] = int(os.environ.get('MAINTENANCE_HOUR', 2)) \
+    if os.environ.get('MAINTENANCE_HOUR', '2') else None
+app.config['SNAPSHOT_DIR'] = os.environ.get('SNAPSHOT_DIR', os.path.join(app.instance_path, 'snapshot'))
+app.config['RECOGNITION_SHARD_MAP'] = os.environ.get('RECOGNITION_SHARD_MAP')  # None matches in-process
+app.config['ASSET_BUILD_DIR'] = os.environ.get('ASSET_BUILD_DIR')  # None builds into static/build
 
 # Initialize database
 db.init_app(app)
@@ -28,6 +53,39 @@ db.init_app(app)
 with app.app_context():
     init_db()
 
+# Background recognition of camera frames submitted through /recognition_jobs
+recognition_jobs = RecognitionJobQueue()
+
+# Duplicate and retried attendance marks share one database write
+attendance_marks = MarkCoalescer()
+
+# Scan cadence hints and load shedding for the recognition routes
+load_controller = LoadController(extra_depth=recognition_jobs.depth)
+
+# Match against the shards of the recognition service when one is configured
+sharded_gallery = None
+if app.config['RECOGNITION_SHARD_MAP']:
+    sharded_gallery = ShardedGallery(app.config['RECOGNITION_SHARD_MAP'])
+    # Set before first use so the web workers never load the full gallery
+    face_engine.face_engine = face_engine.FaceRecognitionEngine(gallery_service=sharded_gallery)
+
+# Content-hashed static files for templates, ETags for rendered pages
+assets = AssetPipeline(app.static_folder, app.config['ASSET_BUILD_DIR'])
+assets.build()
+app.jinja_env.globals['asset_url'] = assets.url
+app.after_request(conditional_page)
+
+def start_maintenance():
+    """
+    Start the nightly thread moving closed terms out of the attendance table
+    and compacting the database
+
+    Called by the server entry points (app.run below and gunicorn.conf.py),
+    never on import, so scripts and tests importing app stay idle.
+    """
+    if app.config['MAINTENANCE_HOUR'] is not None:
+        return start_maintenance_scheduler(app, app.config['MAINTENANCE_HOUR'])
+
 # Decorator for teacher-only routes
 def teacher_required(f):
     @wraps(f)
@@ -82,102 +140,192 @@ def take_attendance(section_id):
 
 @app.route('/detect_face_attendance', methods=['POST'])
 @teacher_required
+@load_controller.managed(CLASSROOM)
+@instrument_route('detect_face_attendance')
+@profiler.profile('detect_face_attendance')
 def detect_face_attendance():
     """Detect face during attendance taking"""
     try:
         data = request.get_json()
-        image_data = data['image']
         section_id = data['section_id']
         
-        # Convert base64 image to OpenCV format
-        image_data = image_data.split(',')[1] if ',' in image_data else image_data
-        nparr = np.frombuffer(base64.b64decode(image_data), np.uint8)
-        img = cv2.imdecode(nparr, cv2.IMREAD_COLOR)
+        return jsonify(recognize_attendance_frame(
+            data['image'], section_id, attendance_session_key(section_id), 'detect_face_attendance'))
         
-        # Detect faces
-        face_locations = face_recognition.face_locations(img)
-        face_encodings = face_recognition.face_encodings(img, face_locations)
+    except Exception as e:
+        return jsonify({'success': False, 'message': str(e)})
+
+@app.route('/recognition_jobs', methods=['POST'])
+@teacher_required
+@load_controller.managed(CLASSROOM, track=False)
+def submit_recognition_job():
+    """Queue a camera frame for recognition and return a job id to poll"""
+    try:
+        data = request.get_json()
+        image_data = data['image']
+        section_id = data['section_id']
+        session_key = attendance_session_key(section_id)
         
-        if not face_encodings:
-            return jsonify({'success': False, 'message': 'No face detected'})
+        @profiler.profile('recognition_job')
+        def handler(image_data):
+            with app.app_context():
+                metrics.inc('recognition_frames_total', route='recognition_job')
+                start = time.perf_counter()
+                try:
+                    with metrics.timer('recognition_request_seconds', route='recognition_job'):
+                        return recognize_attendance_frame(image_data, section_id, session_key, 'recognition_job')
+                finally:
+                    load_controller.record_latency(time.perf_counter() - start)
         
-        # Load known encodings for this section
-        section = Section.query.get(section_id)
-        students = Student.query.filter_by(section_id=section_id).all()
+        job_id = recognition_jobs.submit(session_key, handler, image_data, owner=session.get('user_id'))
         
-        # Match faces
-        for face_encoding in face_encodings:
-            for student in students:
-                # Load student encoding
-                encoding_path = os.path.join('encodings', f"{student.sr_code}.pkl")
-                if os.path.exists(encoding_path):
-                    with open(encoding_path, 'rb') as f:
-                        known_encoding = pickle.load(f)
-                    
-                    # Compare faces
-                    matches = face_recognition.compare_faces([known_encoding], face_encoding)
-                    
-                    if True in matches:
-                        # Mark attendance
-                        mark_attendance_for_student(student.id, section_id)
-                        
-                        return jsonify({
-                            'success': True,
-                            'student': {
-                                'id': student.id,
-                                'name': student.name,
-                                'sr_code': student.sr_code
-                            },
-                            'status': calculate_attendance_status()
-                        })
-        
-        return jsonify({'success': False, 'message': 'Face not recognized'})
+        return jsonify({'success': True, 'job_id': job_id, 'status': 'queued'})
         
     except Exception as e:
         return jsonify({'success': False, 'message': str(e)})
 
+@app.route('/recognition_jobs/<job_id>', methods=['GET'])
+@teacher_required
+@load_controller.managed(CLASSROOM, track=False, shed=False)
+def get_recognition_job(job_id):
+    """Return a recognition job's status, long-polling up to ?wait= seconds"""
+    wait = request.args.get('wait', 0, type=float)
+    if not math.isfinite(wait):
+        wait = 0
+    wait = min(max(wait, 0), app.config['RECOGNITION_JOB_MAX_WAIT'])
+    job = recognition_jobs.get(job_id, wait=wait, owner=session.get('user_id'))
+    
+    if job is None:
+        return jsonify({'success': False, 'message': 'Job not found'}), 404
+    
+    return jsonify({
+        'success': True,
+        'job_id': job_id,
+        'status': job['status'],
+        'result': job.get('result')
+    })
+
+def recognize_attendance_frame(image_data, section_id, session_key, route):
+    """
+    Recognize students in a camera frame and mark their attendance
+    
+    Args:
+        image_data: Base64 encoded image, optionally as a data URL
+        section_id: Section the camera session belongs to
+        session_key: Camera session used for face tracking
+        route: Name used to label the metrics
+        
+    Returns:
+        dict: JSON response body
+    """
+    with metrics.timer('recognition_stage_seconds', route=route, stage='decode'):
+        # Convert base64 image to OpenCV format
+        image_data = image_data.split(',')[1] if ',' in image_data else image_data
+        nparr = np.frombuffer(base64.b64decode(image_data), np.uint8)
+        img = cv2.imdecode(nparr, cv2.IMREAD_COLOR)
+        img = cv2.cvtColor(img, cv2.COLOR_BGR2RGB)
+    
+    # Load known students for this section
+    students = Student.query.filter_by(section_id=section_id).all()
+    students_by_sr_code = {student.sr_code: student for student in students}
+    if not students_by_sr_code:
+        return {'success': False, 'message': 'No students in this section'}
+    
+    # Match faces, reusing identities of faces tracked in earlier frames
+    engine = face_engine.face_engine
+    if app.config['FACE_TRACKING_ENABLED']:
+        matches = engine.recognize_face_tracked(img, session_key, list(students_by_sr_code))
+    else:
+        matches = engine.recognize_face(img, list(students_by_sr_code))
+    
+    if not matches:
+        metrics.inc('recognition_rejections_total', route=route)
+        return {'success': False, 'message': 'Face not recognized'}
+    
+    metrics.inc('recognition_matches_total', len(matches), route=route)
+    
+    # Mark attendance for everyone recognized in the frame
+    with metrics.timer('recognition_stage_seconds', route=route, stage='db_write'):
+        for sr_code, confidence in matches:
+            mark_attendance_for_student(students_by_sr_code[sr_code].id, section_id)
+    
+    student = students_by_sr_code[matches[0][0]]
+    return {
+        'success': True,
+        'student': {
+            'id': student.id,
+            'name': student.name,
+            'sr_code': student.sr_code
+        },
+        'status': calculate_attendance_status()
+    }
+
 @app.route('/mark_attendance', methods=['POST'])
 @teacher_required
+@profiler.profile('mark_attendance')
 def mark_attendance():
-    """Manually mark attendance for a student"""
+    """
+    Manually mark attendance for a student
+    
+    A retry carrying the same Idempotency-Key header (or request_id) gets the
+    first outcome back, and identical marks in flight at the same time
+    share one database write. Reusing a key for a different mark is
+    answered with 422.
+    """
     try:
         data = request.get_json()
         sr_code = data['sr_code']
         section_id = data['section_id']
         status = data['status']
         manual = data.get('manual', False)
-        
-        student = Student.query.filter_by(sr_code=sr_code, section_id=section_id).first()
-        if not student:
-            return jsonify({'success': False, 'message': 'Student not found in this section'})
-        
         today = datetime.now().date()
         
-        # Check if already marked today
-        existing = Attendance.query.filter_by(
-            student_id=student.id,
-            section_id=section_id,
-            date=today
-        ).first()
+        idempotency_key = request.headers.get('Idempotency-Key') or data.get('request_id')
+        if idempotency_key:
+            idempotency_key = f"{session.get('user_id')}:{idempotency_key}"
+        fingerprint = hashlib.sha256(json.dumps(
+            {k: v for k, v in data.items() if k != 'request_id'}, sort_keys=True).encode('utf-8')).hexdigest()
         
-        if existing:
-            existing.status = status
-            existing.time_in = datetime.now() if status in ['present', 'late'] else None
-        else:
-            attendance = Attendance(
+        def write():
+            student = Student.query.filter_by(sr_code=sr_code, section_id=section_id).first()
+            if not student:
+                return {'success': False, 'message': 'Student not found in this section'}
+            
+            # Check if already marked today
+            existing = Attendance.query.filter_by(
                 student_id=student.id,
                 section_id=section_id,
-                date=today,
-                status=status,
-                time_in=datetime.now() if status in ['present', 'late'] else None,
-                marked_by='teacher' if manual else 'face_recognition'
-            )
-            db.session.add(attendance)
-        
-        db.session.commit()
+                date=today
+            ).first()
+            
+            if existing:
+                existing.status = status
+                existing.time_in = datetime.now().time() if status in ['present', 'late'] else None
+            else:
+                attendance = Attendance(
+                    student_id=student.id,
+                    section_id=section_id,
+                    date=today,
+                    status=status,
+                    time_in=datetime.now().time() if status in ['present', 'late'] else None,
+                    marked_by='teacher' if manual else 'face_recognition'
+                )
+                db.session.add(attendance)
+            
+            db.session.commit()
+            # A face mark cached for this student would report the old status
+            attendance_marks.forget(('face', student.id, section_id, today))
+            
+            return {'success': True, 'message': f'Attendance marked as {status}'}
         
-        return jsonify({'success': True, 'message': f'Attendance marked as {status}'})
+        # A teacher may change a status again right away, so finished manual
+        # marks are not reused; only overlapping duplicates and retries are
+        return jsonify(attendance_marks.mark(('manual', sr_code, section_id, today, status, manual),
+                                             write, idempotency_key, result_ttl=0,
+                                             fingerprint=fingerprint))
         
+    except IdempotencyKeyReused as e:
+        return jsonify({'success': False, 'message': str(e)}), 422
     except Exception as e:
         return jsonify({'success': False, 'message': str(e)})
 
@@ -213,12 +361,22 @@ def end_attendance_session():
                 db.session.add(attendance)
         
         db.session.commit()
+        # Cached face marks must not outlive the statuses written here
+        for student in students:
+            attendance_marks.forget(('face', student.id, section_id, today))
+        
+        # Camera session is over, drop its tracked faces
+        face_engine.face_engine.end_tracking(attendance_session_key(section_id))
         
         return jsonify({'success': True, 'message': 'Attendance session ended'})
         
     except Exception as e:
         return jsonify({'success': False, 'message': str(e)})
 
+def attendance_session_key(section_id):
+    """Key identifying the current teacher's camera session for a section"""
+    return f"{session.get('user_id')}:{section_id}"
+
 def calculate_attendance_status():
     """Calculate if student is late based on schedule"""
     current_time = datetime.now().time()
@@ -234,16 +392,27 @@ def calculate_attendance_status():
         return 'present'
 
 def mark_attendance_for_student(student_id, section_id):
-    """Mark attendance for a specific student"""
-    today = datetime.now().date()
+    """
+    Mark attendance for a specific student
     
-    existing = Attendance.query.filter_by(
-        student_id=student_id,
-        section_id=section_id,
-        date=today
-    ).first()
+    Repeated recognitions of the same student in the same section and day
+    share one database write and its outcome.
+    
+    Returns:
+        dict: {'status': ..., 'already_marked': bool}
+    """
+    today = datetime.now().date()
     
-    if not existing:
+    def write():
+        existing = Attendance.query.filter_by(
+            student_id=student_id,
+            section_id=section_id,
+            date=today
+        ).first()
+        
+        if existing:
+            return {'status': existing.status, 'already_marked': True}
+        
         status = calculate_attendance_status()
         
         attendance = Attendance(
@@ -251,13 +420,15 @@ def mark_attendance_for_student(student_id, section_id):
             section_id=section_id,
             date=today,
             status=status,
-            time_in=datetime.now(),
+            time_in=datetime.now().time(),
             marked_by='face_recognition'
         )
         db.session.add(attendance)
         db.session.commit()
         
-    return True
+        return {'status': status, 'already_marked': False}
+    
+    return attendance_marks.mark(('face', student_id, section_id, today), write)
 
 # ============ STUDENT ROUTES ============
 
@@ -298,6 +469,9 @@ def student_register():
         db.session.add(student)
         db.session.commit()
         
+        if sharded_gallery is not None:
+            sharded_gallery.request_rebalance(app)
+        
         return jsonify({'success': True, 'message': 'Registration successful'})
     
     return render_template('student_register.html')
@@ -329,10 +503,8 @@ def student_profile():
     student = Student.query.get(student_id)
     
     thirty_days_ago = datetime.now().date() - timedelta(days=30)
-    attendance_records = Attendance.query.filter(
-        Attendance.student_id == student_id,
-        Attendance.date >= thirty_days_ago
-    ).order_by(Attendance.date.desc()).all()
+    attendance_records = attendance_history(app.config['ARCHIVE_DIR'], thirty_days_ago,
+                                            student_id=student_id)
     
     return render_template('student_profile.html', 
                          student=student, 
@@ -346,78 +518,136 @@ def student_scan():
     return render_template('student_scan.html')
 
 @app.route('/api/detect_attendance', methods=['POST'])
+@load_controller.managed(KIOSK)
+@instrument_route('detect_attendance')
+@profiler.profile('detect_attendance')
 def detect_attendance():
     """Detect student from face and mark attendance"""
     try:
-        data = request.get_json()
-        face_encoding = data.get('face_encoding')
+        with metrics.timer('recognition_stage_seconds', route='detect_attendance', stage='decode'):
+            if request.mimetype == encoding_protocol.CONTENT_TYPE:
+                # Packed float32 encoding from a kiosk client
+                try:
+                    face_encoding, kiosk_id, captured_at = encoding_protocol.unpack_encoding(request.get_data())
+                except ValueError as e:
+                    return jsonify({'success': False, 'message': str(e)}), 400
+                
+                allowed_kiosks = app.config['KIOSK_IDS']
+                if allowed_kiosks is not None and kiosk_id not in allowed_kiosks:
+                    return jsonify({'success': False, 'message': 'Unknown kiosk'}), 403
+                
+                if abs(datetime.now().timestamp() - captured_at) > app.config['KIOSK_MAX_CLOCK_SKEW']:
+                    metrics.inc('recognition_rejections_total', route='detect_attendance')
+                    return jsonify({'success': False, 'message': 'Stale face encoding'})
+            else:
+                data = request.get_json()
+                face_encoding = data.get('face_encoding')
+                
+                if not face_encoding:
+                    metrics.inc('recognition_rejections_total', route='detect_attendance')
+                    return jsonify({'success': False, 'message': 'No face detected'})
+                
+                # Convert encoding from list to numpy array
+                face_encoding = np.array(face_encoding)
         
-        if not face_encoding:
-            return jsonify({'success': False, 'message': 'No face detected'})
+        # Find the closest registered student
+        with metrics.timer('recognition_stage_seconds', route='detect_attendance', stage='match'):
+            match = face_engine.face_engine.match_encoding(face_encoding)
+            student = Student.query.filter_by(sr_code=match[0]).first() if match else None
         
-        # Convert encoding from list to numpy array
-        face_encoding = np.array(face_encoding)
+        if not student:
+            metrics.inc('recognition_rejections_total', route='detect_attendance')
+            return jsonify({'success': False, 'message': 'Face not recognized'})
         
-        # Load all student encodings and find match
-        encodings_dir = 'encodings'
-        if not os.path.exists(encodings_dir):
-            return jsonify({'success': False, 'message': 'No registered students'})
+        metrics.inc('recognition_matches_total', route='detect_attendance')
         
-        for filename in os.listdir(encodings_dir):
-            if filename.endswith('.pkl'):
-                sr_code = filename.replace('.pkl', '')
-                encoding_path = os.path.join(encodings_dir, filename)
-                
-                with open(encoding_path, 'rb') as f:
-                    stored_encoding = pickle.load(f)
-                
-                # Compare faces
-                distance = np.linalg.norm(face_encoding - stored_encoding)
-                
-                if distance < 0.6:  # Match found
-                    student = Student.query.filter_by(sr_code=sr_code).first()
-                    if student:
-                        # Check if already marked today
-                        today = datetime.now().date()
-                        existing = Attendance.query.filter_by(
-                            student_id=student.id,
-                            date=today
-                        ).first()
-                        
-                        current_time = datetime.now().time()
-                        is_late = current_time > datetime.strptime("09:00:00", "%H:%M:%S").time()
-                        
-                        if not existing:
-                            attendance = Attendance(
-                                student_id=student.id,
-                                section_id=student.section_id,
-                                date=today,
-                                time_in=current_time,
-                                status='Present' if not is_late else 'Late'
-                            )
-                            db.session.add(attendance)
-                            db.session.commit()
-                        else:
-                            return jsonify({
-                                'success': False,
-                                'message': f'Already marked attendance today at {existing.time_in}'
-                            })
-                        
-                        section = Section.query.get(student.section_id)
-                        return jsonify({
-                            'success': True,
-                            'student_name': student.name,
-                            'sr_code': student.sr_code,
-                            'class': section.name if section else 'Unknown',
-                            'time_in': str(current_time),
-                            'status': 'Present' if not is_late else 'Late'
-                        })
-        
-        return jsonify({'success': False, 'message': 'Face not recognized'})
+        with metrics.timer('recognition_stage_seconds', route='detect_attendance', stage='db_write'):
+            # Check if already marked today
+            today = datetime.now().date()
+            existing = Attendance.query.filter_by(
+                student_id=student.id,
+                date=today
+            ).first()
+            
+            current_time = datetime.now().time()
+            is_late = current_time > datetime.strptime("09:00:00", "%H:%M:%S").time()
+            
+            if existing:
+                return jsonify({
+                    'success': False,
+                    'message': f'Already marked attendance today at {existing.time_in}'
+                })
+            
+            attendance = Attendance(
+                student_id=student.id,
+                section_id=student.section_id,
+                date=today,
+                time_in=current_time,
+                status='Present' if not is_late else 'Late',
+                marked_by='face_recognition'
+            )
+            db.session.add(attendance)
+            db.session.commit()
+        
+        section = Section.query.get(student.section_id)
+        return jsonify({
+            'success': True,
+            'student_name': student.name,
+            'sr_code': student.sr_code,
+            'class': section.name if section else 'Unknown',
+            'time_in': str(current_time),
+            'status': 'Present' if not is_late else 'Late'
+        })
     
     except Exception as e:
         return jsonify({'success': False, 'message': str(e)})
 
+@app.route('/metrics')
+def metrics_endpoint():
+    """Prometheus metrics aggregated across all workers"""
+    return Response(metrics.render(), mimetype='text/plain; version=0.0.4')
+
+# ============ PROFILING ROUTES ============
+
+@app.route('/admin/profiles')
+@teacher_required
+def list_profiles():
+    """Captured profiles, newest first, and the current profiling settings"""
+    return jsonify({
+        'success': True,
+        'settings': profiler.settings(),
+        'profiles': profiler.list_profiles()
+    })
+
+@app.route('/admin/profiles/settings', methods=['POST'])
+@teacher_required
+def configure_profiling():
+    """Profile every call of the given names and/or a sampled fraction of all calls"""
+    try:
+        data = request.get_json(silent=True)
+        if not isinstance(data, dict):
+            return jsonify({'success': False, 'message': 'Expected a JSON object'}), 400
+        settings = profiler.configure(data.get('names'), data.get('sample_rate'))
+        return jsonify({'success': True, 'settings': settings})
+        
+    except ValueError as e:
+        return jsonify({'success': False, 'message': str(e)}), 400
+    except Exception as e:
+        return jsonify({'success': False, 'message': str(e)})
+
+@app.route('/admin/profiles/<filename>')
+@teacher_required
+def download_profile(filename):
+    """Download a .prof (cProfile stats) or .json (SQL statements) capture file"""
+    if not profiler.is_profile_file(filename):
+        return jsonify({'success': False, 'message': 'Profile not found'}), 404
+    return send_from_directory(os.path.abspath(profiler.profiles_dir), filename, as_attachment=True)
+
+@app.route('/assets/<path:filename>')
+def asset(filename):
+    """Serve a content-hashed static file"""
+    return assets.send(filename)
+
 # ============ GENERAL ROUTES ============
 
 @app.route('/')
@@ -453,25 +683,74 @@ def teacher_dashboard():
     """Teacher dashboard"""
     teacher_id = session.get('user_id')
     teacher = Teacher.query.get(teacher_id)
-    sections = Section.query.filter_by(teacher_id=teacher_id).all()
+    sections = section_summaries(teacher_id, datetime.now().date())
     
-    return render_template('teacher_dashboard.html', teacher=teacher, sections=sections)
+    return render_template('teacher_dashboard.html',
+                         teacher=teacher,
+                         teacher_name=teacher.name if teacher else '',
+                         sections=sections,
+                         attendance_summary=sections)
 
 @app.route('/teacher_sections')
 @teacher_required
 def teacher_sections():
     """List sections for teacher"""
     teacher_id = session.get('user_id')
-    sections = Section.query.filter_by(teacher_id=teacher_id).all()
+    sections = section_summaries(teacher_id, datetime.now().date())
     
     sections_data = [{
-        'id': s.id,
-        'name': s.name,
-        'student_count': len(s.students)
+        'id': s['id'],
+        'name': s['name'],
+        'student_count': s['total_students']
     } for s in sections]
     
     return jsonify(sections_data)
 
+@app.route('/create_section', methods=['GET', 'POST'])
+@teacher_required
+def create_section():
+    """
+    Create a section for the logged in teacher
+    
+    The section is stored as "<code> - <name>"; the code must be unique
+    among the teacher's sections.
+    """
+    if request.method == 'POST':
+        teacher_id = session.get('user_id')
+        section_code = request.form.get('section_code', '').strip()
+        section_name = request.form.get('section_name', '').strip()
+        department = request.form.get('department', '').strip()
+        
+        if not section_code or not section_name or not department:
+            flash('Section code, section name and department are required', 'danger')
+            return render_template('create_section.html')
+        
+        if ' - ' in section_code:
+            flash('Section code may not contain " - "', 'danger')
+            return render_template('create_section.html')
+        
+        name = f"{section_code} - {section_name}"
+        if len(name) > Section.name.type.length:
+            flash(f'Section code and name may be at most {Section.name.type.length - 3} characters together', 'danger')
+            return render_template('create_section.html')
+        
+        existing = db.session.query(Section.name).filter_by(teacher_id=teacher_id).all()
+        if any(existing_name.split(' - ', 1)[0] == section_code for (existing_name,) in existing):
+            flash(f'Section {section_code} already exists', 'danger')
+            return render_template('create_section.html')
+        
+        try:
+            db.session.add(Section(name=name, teacher_id=teacher_id, department=department))
+            db.session.commit()
+        except Exception as e:
+            db.session.rollback()
+            flash(f'Error creating section: {e}', 'danger')
+            return render_template('create_section.html')
+        
+        return redirect(url_for('teacher_dashboard'))
+    
+    return render_template('create_section.html')
+
 @app.route('/view_attendance/<int:section_id>')
 @teacher_required
 def view_attendance(section_id):
@@ -480,10 +759,8 @@ def view_attendance(section_id):
     students = Student.query.filter_by(section_id=section_id).all()
     
     thirty_days_ago = datetime.now().date() - timedelta(days=30)
-    attendance_records = Attendance.query.filter(
-        Attendance.section_id == section_id,
-        Attendance.date >= thirty_days_ago
-    ).order_by(Attendance.date.desc()).all()
+    attendance_records = attendance_history(app.config['ARCHIVE_DIR'], thirty_days_ago,
+                                            section_id=section_id)
     
     return render_template('view_attendance.html',
                          section=section,
@@ -508,5 +785,6 @@ def internal_error(error):
 if __name__ == '__main__':
     with app.app_context():
         db.create_all()
+    start_maintenance()
     port = int(os.environ.get('PORT', 5000))
     app.run(host='127.0.0.1', port=port, debug=False)
\ No newline at end of file
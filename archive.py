@@ -0,0 +1,352 @@
+#!/usr/bin/env python
+"""
+Attendance Archive Module for Attendance System
+Keeps the live attendance table down to the current term
+
+Attendance of closed terms is moved into one SQLite file per term
+(ARCHIVE_DIR/attendance_<term>.db). attendance_history() reads the live
+table and, only when the requested date range reaches into closed terms,
+the matching archive files. A maintenance thread archives closed terms
+and VACUUMs the live database once a night, in a local off-hours window,
+then refreshes the columnar analytics snapshot (see analytics.py).
+
+Run `python archive.py` to archive and compact immediately (e.g. from cron).
+"""
+
+import os
+import sqlite3
+import sys
+import threading
+import time
+from datetime import date, datetime, timedelta, time as dt_time
+
+from sqlalchemy.engine import make_url
+
+from database import db, Attendance, Student, Section
+
+# Terms start on the first day of these months
+TERM_START_MONTHS = (1, 7)
+
+ARCHIVE_COLUMNS = ('id', 'student_id', 'section_id', 'date', 'status',
+                   'time_in', 'time_out', 'marked_by', 'created_at')
+
+ARCHIVE_SCHEMA = """
+CREATE TABLE IF NOT EXISTS {schema}.attendance (
+    id INTEGER PRIMARY KEY,
+    student_id INTEGER NOT NULL,
+    section_id INTEGER NOT NULL,
+    date DATE NOT NULL,
+    status VARCHAR(20) NOT NULL,
+    time_in TIME,
+    time_out TIME,
+    marked_by VARCHAR(50) NOT NULL,
+    created_at DATETIME
+)
+"""
+
+
+# ============ TERMS ============
+
+def term_for(day):
+    """Return the term a date belongs to, e.g. '2025-2' for the second term of 2025"""
+    index = max(i for i, month in enumerate(TERM_START_MONTHS) if month <= day.month)
+    return f"{day.year}-{index + 1}"
+
+
+def term_bounds(term):
+    """Return (first day, first day of the next term) of a term"""
+    year, index = (int(part) for part in term.split('-'))
+    start = date(year, TERM_START_MONTHS[index - 1], 1)
+    if index < len(TERM_START_MONTHS):
+        end = date(year, TERM_START_MONTHS[index], 1)
+    else:
+        end = date(year + 1, TERM_START_MONTHS[0], 1)
+    return start, end
+
+
+def terms_between(start, end):
+    """Terms overlapping the date range [start, end]"""
+    terms = []
+    term = term_for(start)
+    while True:
+        terms.append(term)
+        term_start, term_end = term_bounds(term)
+        if term_end > end:
+            return terms
+        term = term_for(term_end)
+
+
+def archive_path(archive_dir, term):
+    return os.path.join(archive_dir, f'attendance_{term}.db')
+
+
+def default_archive_dir(database_uri, instance_path):
+    """
+    Archive directory next to the live SQLite database
+
+    Relative SQLite paths are resolved against the instance folder, as
+    Flask-SQLAlchemy does. Other databases archive to the instance folder.
+    """
+    url = make_url(database_uri)
+    if url.get_backend_name() != 'sqlite' or not url.database or url.database == ':memory:':
+        return os.path.join(instance_path, 'archive')
+    return os.path.join(os.path.dirname(os.path.join(instance_path, url.database)), 'archive')
+
+
+# ============ ARCHIVING ============
+
+def archive_closed_terms(archive_dir, today=None):
+    """
+    Move attendance of every term before the current one into archive files
+
+    Args:
+        archive_dir: Directory holding the per-term archive files
+        today: Date deciding the current term (defaults to today)
+
+    Returns:
+        dict: Rows moved per term
+    """
+    today = today or datetime.now().date()
+    current_start, _ = term_bounds(term_for(today))
+
+    oldest = db.session.query(db.func.min(Attendance.date)).scalar()
+    db.session.commit()
+    if oldest is None or oldest >= current_start:
+        return {}
+
+    os.makedirs(archive_dir, exist_ok=True)
+    moved = {}
+
+    for term in terms_between(oldest, current_start):
+        start, end = term_bounds(term)
+        if start >= current_start:
+            break
+        moved[term] = _move_term(archive_path(archive_dir, term), start, end)
+        print(f"Archived {moved[term]} attendance records for term {term}")
+
+    return moved
+
+
+def _move_term(path, start, end):
+    """Copy one term's rows into its archive file and delete them, in one transaction"""
+    columns = ', '.join(ARCHIVE_COLUMNS)
+    bounds = (start.isoformat(), end.isoformat())
+
+    conn = db.engine.raw_connection()
+    try:
+        cursor = conn.cursor()
+        cursor.execute("ATTACH DATABASE ? AS archive", (path,))
+        cursor.execute(ARCHIVE_SCHEMA.format(schema='archive'))
+        cursor.execute("CREATE INDEX IF NOT EXISTS archive.ix_attendance_student_date "
+                       "ON attendance (student_id, date)")
+        cursor.execute("CREATE INDEX IF NOT EXISTS archive.ix_attendance_section_date "
+                       "ON attendance (section_id, date)")
+        cursor.execute(f"INSERT OR REPLACE INTO archive.attendance ({columns}) "
+                       f"SELECT {columns} FROM main.attendance WHERE date >= ? AND date < ?", bounds)
+        moved = cursor.rowcount
+        cursor.execute("DELETE FROM main.attendance WHERE date >= ? AND date < ?", bounds)
+        conn.commit()
+        return moved
+    except Exception:
+        conn.rollback()
+        raise
+    finally:
+        # The connection goes back to the pool, so it must not keep the
+        # archive attached after a failure either (DETACH needs the
+        # transaction ended first, hence after the rollback)
+        try:
+            conn.cursor().execute("DETACH DATABASE archive")
+        except sqlite3.Error:
+            pass
+        conn.close()
+
+
+# ============ READING ============
+
+class ArchivedAttendance:
+    """Read-only attendance record loaded from an archive file"""
+
+    def __init__(self, row):
+        self.id = row['id']
+        self.student_id = row['student_id']
+        self.section_id = row['section_id']
+        self.date = date.fromisoformat(row['date'])
+        self.status = row['status']
+        self.time_in = dt_time.fromisoformat(row['time_in']) if row['time_in'] else None
+        self.time_out = dt_time.fromisoformat(row['time_out']) if row['time_out'] else None
+        self.marked_by = row['marked_by']
+        self.created_at = datetime.fromisoformat(row['created_at']) if row['created_at'] else None
+        self.student = None
+        self.section = None
+
+    def __repr__(self):
+        return f'<ArchivedAttendance {self.student_id} {self.date} {self.status}>'
+
+
+def attendance_history(archive_dir, start, end=None, student_id=None, section_id=None):
+    """
+    Attendance records in a date range, newest first, from the live table and archives
+
+    Archive files are only opened for closed terms the range reaches into.
+
+    Args:
+        archive_dir: Directory holding the per-term archive files
+        start: First date of the range
+        end: Last date of the range (defaults to today)
+        student_id: Only this student's records (optional)
+        section_id: Only this section's records (optional)
+
+    Returns:
+        list: Attendance and ArchivedAttendance records
+    """
+    end = end or datetime.now().date()
+
+    query = Attendance.query.filter(Attendance.date >= start, Attendance.date <= end)
+    if student_id is not None:
+        query = query.filter(Attendance.student_id == student_id)
+    if section_id is not None:
+        query = query.filter(Attendance.section_id == section_id)
+    records = query.order_by(Attendance.date.desc()).all()
+
+    current_start, _ = term_bounds(term_for(datetime.now().date()))
+    if start >= current_start:
+        return records
+
+    archived = []
+    for term in terms_between(start, min(end, current_start)):
+        path = archive_path(archive_dir, term)
+        if term_bounds(term)[0] < current_start and os.path.exists(path):
+            archived.extend(_read_archive(path, start, end, student_id, section_id))
+
+    if not archived:
+        return records
+
+    # Resolve students and sections for all archived rows in two queries
+    students = {s.id: s for s in Student.query.filter(
+        Student.id.in_({r.student_id for r in archived})).all()}
+    sections = {s.id: s for s in Section.query.filter(
+        Section.id.in_({r.section_id for r in archived})).all()}
+    for record in archived:
+        record.student = students.get(record.student_id)
+        record.section = sections.get(record.section_id)
+
+    return sorted(records + archived, key=lambda r: r.date, reverse=True)
+
+
+def _read_archive(path, start, end, student_id, section_id):
+    sql = (f"SELECT {', '.join(ARCHIVE_COLUMNS)} FROM attendance "
+           "WHERE date >= ? AND date <= ?")
+    params = [start.isoformat(), end.isoformat()]
+    if student_id is not None:
+        sql += " AND student_id = ?"
+        params.append(student_id)
+    if section_id is not None:
+        sql += " AND section_id = ?"
+        params.append(section_id)
+
+    conn = sqlite3.connect(f'file:{path}?mode=ro', uri=True)
+    conn.row_factory = sqlite3.Row
+    try:
+        return [ArchivedAttendance(row) for row in conn.execute(sql, params)]
+    finally:
+        conn.close()
+
+
+# ============ MAINTENANCE ============
+
+def compact_database():
+    """VACUUM the live SQLite database and refresh its query planner statistics"""
+    if db.engine.dialect.name != 'sqlite' or not db.engine.url.database:
+        return False
+
+    conn = sqlite3.connect(db.engine.url.database, isolation_level=None, timeout=30)
+    try:
+        conn.execute("VACUUM")
+        conn.execute("PRAGMA optimize")
+    finally:
+        conn.close()
+
+    print("Database compacted")
+    return True
+
+
+def run_maintenance(app):
+    """Archive closed terms, compact the live database and refresh the analytics snapshot"""
+    from analytics import export_snapshot
+
+    with app.app_context():
+        archive_closed_terms(app.config['ARCHIVE_DIR'])
+        compact_database()
+        if app.config.get('SNAPSHOT_DIR') and db.engine.dialect.name == 'sqlite':
+            export_snapshot(db.engine.url.database, app.config['ARCHIVE_DIR'],
+                            app.config['SNAPSHOT_DIR'])
+
+
+def maintenance_window_date(now, hour, window_hours=2):
+    """
+    Local date the maintenance window containing now opened on
+
+    Returns:
+        date: Opening date of the window, or None outside the window
+    """
+    hours_open = (now.hour - hour) % 24
+    if hours_open >= window_hours:
+        return None
+    return (now - timedelta(hours=hours_open)).date()
+
+
+def start_maintenance_scheduler(app, hour=2, window_hours=2, check_every=300):
+    """
+    Run maintenance in a background thread once a night
+
+    Maintenance starts in the off-hours window [hour, hour + window_hours)
+    of the server's local time (set TZ), once per local date. All gunicorn
+    workers start the thread; a marker file per date in ARCHIVE_DIR makes
+    sure only one of them runs it.
+
+    Args:
+        app: Flask app
+        hour: Local hour (0-23) the window opens
+        window_hours: Length of the window
+        check_every: Seconds between checks, shorter than the window
+    """
+    archive_dir = app.config['ARCHIVE_DIR']
+    os.makedirs(archive_dir, exist_ok=True)
+
+    def loop():
+        while True:
+            time.sleep(check_every)
+            try:
+                day = maintenance_window_date(datetime.now(), hour, window_hours)
+                if day is not None and _claim_run(archive_dir, day):
+                    run_maintenance(app)
+            except Exception as e:
+                print(f"Error during attendance maintenance: {e}")
+
+    thread = threading.Thread(target=loop, name='attendance-maintenance', daemon=True)
+    thread.start()
+    return thread
+
+
+def _claim_run(archive_dir, day):
+    """Claim the maintenance run of a local date; only one process succeeds"""
+    marker = f'.maintenance-{day.isoformat()}'
+    try:
+        fd = os.open(os.path.join(archive_dir, marker), os.O_CREAT | os.O_EXCL | os.O_WRONLY)
+    except FileExistsError:
+        return False
+    os.close(fd)
+
+    for filename in os.listdir(archive_dir):
+        if filename.startswith('.maintenance-') and filename != marker:
+            try:
+                os.remove(os.path.join(archive_dir, filename))
+            except OSError:
+                pass
+    return True
+
+
+if __name__ == "__main__":
+    from app import app
+    run_maintenance(app)
+    sys.exit(0)
@@ -0,0 +1,146 @@
+"""
+Static Assets Module for Attendance System
+Content-hashed, precompressed static files and conditional page responses
+
+At startup every file under static/css and static/js is copied to
+static/build with a hash of its content in the name (style.css becomes
+style.3f2a9c1d04be.css), next to a gzip and, if the brotli package is
+installed, a brotli variant. Templates link them through asset_url(), so a
+changed file gets a new URL and the old one can be cached forever.
+
+Rendered pages get an ETag of their body; a browser reloading a page whose
+data has not changed gets an empty 304 instead of the page.
+"""
+
+import gzip
+import hashlib
+import mimetypes
+import os
+import threading
+
+from flask import request, send_from_directory, url_for
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+ASSET_DIRS = ('css', 'js')
+COMPRESSIBLE = ('.css', '.js', '.svg')
+MIN_COMPRESS_SIZE = 512
+
+# (Accept-Encoding token, file suffix), preferred first
+ENCODINGS = (('br', '.br'), ('gzip', '.gz'))
+
+ONE_YEAR = 365 * 24 * 3600
+
+
+class AssetPipeline:
+    """Builds hashed asset copies and serves them with long-lived cache headers"""
+
+    def __init__(self, static_dir, build_dir=None, hash_length=12):
+        """
+        Args:
+            static_dir: The application's static folder
+            build_dir: Where hashed copies are written (defaults to static/build)
+            hash_length: Hex digits of the content hash kept in file names
+        """
+        self.static_dir = static_dir
+        self.build_dir = build_dir or os.path.join(static_dir, 'build')
+        self.hash_length = hash_length
+        self.manifest = {}
+        self._lock = threading.Lock()
+
+    def build(self):
+        """
+        Write hashed and precompressed copies of all assets
+
+        Returns:
+            dict: Source path (e.g. 'css/style.css') to hashed path
+        """
+        manifest = {}
+        for asset_dir in ASSET_DIRS:
+            source_dir = os.path.join(self.static_dir, asset_dir)
+            if not os.path.isdir(source_dir):
+                continue
+            for filename in sorted(os.listdir(source_dir)):
+                source = f'{asset_dir}/{filename}'
+                if os.path.isfile(os.path.join(source_dir, filename)):
+                    manifest[source] = self._build_file(source)
+
+        with self._lock:
+            self.manifest = manifest
+        print(f"Built {len(manifest)} static assets")
+        return manifest
+
+    def _build_file(self, source):
+        with open(os.path.join(self.static_dir, source), 'rb') as f:
+            content = f.read()
+
+        digest = hashlib.sha256(content).hexdigest()[:self.hash_length]
+        stem, ext = os.path.splitext(source)
+        hashed = f'{stem}.{digest}{ext}'
+        target = os.path.join(self.build_dir, hashed)
+
+        variants = {target: content}
+        if ext in COMPRESSIBLE and len(content) >= MIN_COMPRESS_SIZE:
+            variants[target + '.gz'] = gzip.compress(content, compresslevel=9, mtime=0)
+            if brotli is not None:
+                variants[target + '.br'] = brotli.compress(content)
+
+        # Names are content-addressed, so an existing file is already correct
+        os.makedirs(os.path.dirname(target), exist_ok=True)
+        for path, data in variants.items():
+            if not os.path.exists(path):
+                tmp_path = f'{path}.{os.getpid()}.tmp'
+                with open(tmp_path, 'wb') as f:
+                    f.write(data)
+                os.replace(tmp_path, path)
+
+        return hashed
+
+    def url(self, path):
+        """URL of the hashed copy of a static file, or its plain URL if it was not built"""
+        hashed = self.manifest.get(path)
+        if hashed is None:
+            return url_for('static', filename=path)
+        return url_for('asset', filename=hashed)
+
+    def send(self, filename):
+        """Response for a hashed asset, precompressed if the client accepts it"""
+        mimetype = mimetypes.guess_type(filename)[0]
+        response = None
+
+        for encoding, suffix in ENCODINGS:
+            if encoding in request.accept_encodings and \
+                    os.path.isfile(os.path.join(self.build_dir, filename + suffix)):
+                response = send_from_directory(self.build_dir, filename + suffix, mimetype=mimetype)
+                response.headers['Content-Encoding'] = encoding
+                break
+
+        if response is None:
+            response = send_from_directory(self.build_dir, filename, mimetype=mimetype)
+
+        response.vary.add('Accept-Encoding')
+        response.cache_control.no_cache = None
+        response.cache_control.public = True
+        response.cache_control.max_age = ONE_YEAR
+        response.cache_control.immutable = True
+        return response
+
+
+def conditional_page(response):
+    """
+    after_request hook adding an ETag to rendered HTML pages
+
+    Pages stay private and are revalidated on every load; an unchanged page
+    is answered with 304 and no body.
+    """
+    if request.method != 'GET' or response.status_code != 200 or response.direct_passthrough \
+            or response.mimetype != 'text/html':
+        return response
+
+    response.cache_control.private = True
+    response.cache_control.no_cache = True
+    response.add_etag()
+    return response.make_conditional(request)
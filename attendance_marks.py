@@ -0,0 +1,145 @@
+"""
+Attendance Marks Module for Attendance System
+Idempotent, coalesced attendance writes
+
+Overlapping scans and client retries mark the same student many times
+within seconds. MarkCoalescer lets the first of those calls for a
+(student, section, date, ...) key do the database write while the others
+wait for it and get its outcome back, and keeps that outcome for
+result_ttl seconds so later duplicates skip the database entirely.
+
+Calls carrying an idempotency key (a client request id) get the outcome of
+the first call with that key for key_ttl seconds, provided they carry the
+same payload fingerprint; reusing a key for a different payload raises
+IdempotencyKeyReused.
+
+Code changing attendance outside a mark calls forget() with the key of the
+cached mark so the next one reads the database again.
+
+Both caches are per process; the marks themselves stay safe to repeat, so
+a duplicate reaching another gunicorn worker costs one extra write at most.
+"""
+
+import threading
+import time
+
+from metrics import metrics
+
+
+class IdempotencyKeyReused(Exception):
+    """An idempotency key was sent again with a different payload"""
+
+
+class _PendingMark:
+    def __init__(self):
+        self.done = threading.Event()
+        self.outcome = None
+        self.error = None
+        self.finished_at = None
+
+
+class MarkCoalescer:
+    """Merges duplicate attendance marks into one database write"""
+
+    def __init__(self, result_ttl=60, key_ttl=600, wait_timeout=10, cleanup_interval=60):
+        """
+        Args:
+            result_ttl: Seconds a finished mark answers duplicates of its key
+            key_ttl: Seconds an idempotency key's outcome is kept
+            wait_timeout: Seconds a duplicate waits for the write in progress
+            cleanup_interval: Seconds between sweeps of expired entries
+        """
+        self.result_ttl = result_ttl
+        self.key_ttl = key_ttl
+        self.wait_timeout = wait_timeout
+        self.cleanup_interval = cleanup_interval
+        self._lock = threading.Lock()
+        self._marks = {}
+        self._idempotency_keys = {}
+        self._last_cleanup = 0.0
+
+    def mark(self, key, write, idempotency_key=None, result_ttl=None, fingerprint=None):
+        """
+        Run a mark once per key and share its outcome with duplicates
+
+        Args:
+            key: Hashable identity of the mark, e.g. (student_id, section_id, date)
+            write: Callable doing the database write and returning the outcome
+            idempotency_key: Client request id (optional)
+            result_ttl: Overrides result_ttl for this key; 0 only merges
+                calls that overlap the write in progress
+            fingerprint: Digest of the request payload kept with the
+                idempotency key (defaults to key)
+
+        Returns:
+            The outcome returned by write
+
+        Raises:
+            IdempotencyKeyReused: If idempotency_key was used with another fingerprint
+        """
+        now = time.time()
+        self._maybe_cleanup(now)
+        if result_ttl is None:
+            result_ttl = self.result_ttl
+        if fingerprint is None:
+            fingerprint = key
+
+        with self._lock:
+            if idempotency_key is not None:
+                cached = self._idempotency_keys.get(idempotency_key)
+                if cached is not None and now - cached[0] < self.key_ttl:
+                    if cached[1] != fingerprint:
+                        raise IdempotencyKeyReused('Idempotency key was already used for a different request')
+                    metrics.inc('attendance_marks_replayed_total')
+                    return cached[2]
+
+            pending = self._marks.get(key)
+            leader = pending is None or pending.error is not None or \
+                (pending.finished_at is not None and now - pending.finished_at >= result_ttl)
+            if leader:
+                pending = _PendingMark()
+                self._marks[key] = pending
+
+        if leader:
+            metrics.inc('attendance_marks_written_total')
+            try:
+                pending.outcome = write()
+            except Exception as e:
+                pending.error = e
+            finally:
+                pending.finished_at = time.time()
+                pending.done.set()
+        else:
+            metrics.inc('attendance_marks_coalesced_total')
+            if not pending.done.wait(self.wait_timeout):
+                raise TimeoutError('Timed out waiting for a duplicate attendance mark')
+
+        if pending.error is not None:
+            raise pending.error
+
+        if idempotency_key is not None:
+            with self._lock:
+                self._idempotency_keys[idempotency_key] = (time.time(), fingerprint, pending.outcome)
+        return pending.outcome
+
+    def forget(self, key):
+        """Drop the cached outcome of a mark so the next one reads the database"""
+        with self._lock:
+            self._marks.pop(key, None)
+
+    def reset(self):
+        """Drop every cached mark and idempotency key (e.g. after attendance was deleted)"""
+        with self._lock:
+            self._marks = {}
+            self._idempotency_keys = {}
+
+    def _maybe_cleanup(self, now):
+        if now - self._last_cleanup < self.cleanup_interval:
+            return
+
+        with self._lock:
+            self._last_cleanup = now
+            self._marks = {key: pending for key, pending in self._marks.items()
+                           if pending.finished_at is None or now - pending.finished_at < self.result_ttl}
+            self._idempotency_keys = {key: cached for key, cached in self._idempotency_keys.items()
+                                      if now - cached[0] < self.key_ttl}
@@ -0,0 +1,572 @@
+#!/usr/bin/env python
+"""
+Benchmark suite for the Attendance Management System
+
+Runs without a camera or network, and without any enrolled faces:
+galleries and probe encodings are generated synthetically and a
+SyntheticFaceEngine stands in for face detection and encoding, so the
+timings cover everything after the model (image decode, gallery matching,
+tracking, routing and the database). face_recognition (and dlib) must still
+be installed, since face_engine imports it.
+
+Each engine case runs once per gallery mode ('float64', 'float32', 'int8'),
+and a gallery section reports the memory an engine keeps per 10k students
+in each mode and how often each compact mode disagrees with exact float64
+matching, on random galleries and on clustered galleries of lookalikes
+whose encodings sit 0.4-0.6 apart, right around the 0.6 match tolerance.
+
+The routes are timed one request at a time, then again with several
+threads posting at once (each with its own test client), which reports
+throughput under contention for the database and the attendance mark locks.
+
+Results are written as JSON so runs on different commits can be compared.
+
+Usage:
+  python benchmark.py
+  python benchmark.py --sizes 100,1000,10000 --iterations 200 --output bench.json
+  python benchmark.py --modes float32,int8
+  python benchmark.py --threads 1,4,16
+"""
+
+import argparse
+import base64
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from contextlib import contextmanager
+from datetime import datetime
+
+import numpy as np
+
+# Keep the benchmark away from the real database, metrics, jobs and assets
+WORK_DIR = tempfile.mkdtemp(prefix='attendance_bench_')
+os.environ['DATABASE_URL'] = 'sqlite:///' + os.path.join(WORK_DIR, 'bench.db')
+os.environ['METRICS_DIR'] = os.path.join(WORK_DIR, 'metrics')
+os.environ['JOBS_DIR'] = os.path.join(WORK_DIR, 'jobs')
+os.environ['PROFILES_DIR'] = os.path.join(WORK_DIR, 'profiles')
+os.environ['ASSET_BUILD_DIR'] = os.path.join(WORK_DIR, 'build')
+
+import cv2  # noqa: E402
+
+import face_engine  # noqa: E402
+from app import app, attendance_marks  # noqa: E402
+from database import db, Teacher, Student, Section, Attendance  # noqa: E402
+
+ENCODING_SIZE = 128
+PROBE_NOISE = 0.25
+SECTION_SIZE = 40
+
+
+class SyntheticFaceEngine(face_engine.FaceRecognitionEngine):
+    """
+    FaceRecognitionEngine with detection and encoding replaced
+
+    Every frame contains one face covering the middle of the image; its
+    encoding is whatever probe the calling thread queued with set_probe().
+    The known faces come from a generated gallery instead of the encodings dir.
+    """
+
+    def __init__(self, encodings_dir, gallery, gallery_mode='float32'):
+        self.synthetic_gallery = gallery
+        self._probes = threading.local()
+        super().__init__(encodings_dir, gallery_mode)
+
+    def _read_encodings(self):
+        return dict(self.synthetic_gallery)
+
+    def set_probe(self, encoding):
+        self._probes.encoding = encoding
+
+    @property
+    def probe(self):
+        return getattr(self._probes, 'encoding', None)
+
+    def detect_faces(self, img):
+        height, width = img.shape[:2]
+        return [(height // 4, width * 3 // 4, height * 3 // 4, width // 4)]
+
+    def encode_faces(self, img, face_locations):
+        return [self.probe for _ in face_locations]
+
+
+def make_gallery(size, seed=0):
+    """Random unit-length encodings, far apart like distinct faces"""
+    rng = np.random.default_rng(seed)
+    vectors = rng.normal(size=(size, ENCODING_SIZE))
+    vectors /= np.linalg.norm(vectors, axis=1, keepdims=True)
+    return {f"{i // 100000:02d}-{i % 100000:05d}": vectors[i].copy() for i in range(size)}
+
+
+def make_clustered_gallery(size, seed=0, cluster_size=4, spread=(0.3, 0.45)):
+    """
+    Encodings in clusters of lookalikes, as siblings or similar faces give
+
+    Each member is its cluster centre plus noise of a norm drawn from
+    spread, which puts members of one cluster about 0.4-0.6 apart. One
+    extra member per cluster is left out of the gallery and returned as a
+    lookalike stranger.
+
+    Returns:
+        tuple: (gallery dict, list of stranger encodings)
+    """
+    rng = np.random.default_rng(seed)
+    clusters = -(-size // cluster_size)
+    centres = rng.normal(size=(clusters, ENCODING_SIZE))
+    centres /= np.linalg.norm(centres, axis=1, keepdims=True)
+
+    members = np.repeat(centres, cluster_size + 1, axis=0)
+    noise = rng.normal(size=members.shape)
+    noise *= rng.uniform(*spread, size=(len(members), 1)) / np.linalg.norm(noise, axis=1, keepdims=True)
+    members += noise
+    members /= np.linalg.norm(members, axis=1, keepdims=True)
+
+    is_stranger = np.arange(len(members)) % (cluster_size + 1) == cluster_size
+    enrolled = members[~is_stranger][:size]
+    gallery = {f"{i // 100000:02d}-{i % 100000:05d}": enrolled[i].copy() for i in range(size)}
+    return gallery, list(members[is_stranger])
+
+
+def make_probes(gallery, count, seed=1, unknown_fraction=0.1, strangers=None):
+    """Noisy copies of gallery encodings plus some strangers (random unless given)"""
+    rng = np.random.default_rng(seed)
+    sr_codes = list(gallery)
+    probes = []
+    for _ in range(count):
+        if rng.random() < unknown_fraction:
+            if strangers is not None:
+                noise = rng.normal(size=ENCODING_SIZE)
+                noise *= PROBE_NOISE / np.linalg.norm(noise)
+                probes.append((None, strangers[rng.integers(len(strangers))] + noise))
+                continue
+            vector = rng.normal(size=ENCODING_SIZE)
+            probes.append((None, vector / np.linalg.norm(vector)))
+        else:
+            sr_code = sr_codes[rng.integers(len(sr_codes))]
+            noise = rng.normal(size=ENCODING_SIZE)
+            noise *= PROBE_NOISE / np.linalg.norm(noise)
+            probes.append((sr_code, gallery[sr_code] + noise))
+    return probes
+
+
+def make_frame(seed=0, width=640, height=480):
+    """Base64 JPEG data URL of a random frame, as the camera pages send"""
+    rng = np.random.default_rng(seed)
+    img = rng.integers(0, 256, size=(height, width, 3), dtype=np.uint8)
+    ok, jpeg = cv2.imencode('.jpg', img, [cv2.IMWRITE_JPEG_QUALITY, 80])
+    return 'data:image/jpeg;base64,' + base64.b64encode(jpeg.tobytes()).decode()
+
+
+def summarize(samples):
+    """Latency statistics in milliseconds"""
+    ordered = sorted(samples)
+    return {
+        'iterations': len(samples),
+        'mean_ms': statistics.mean(samples) * 1000,
+        'p50_ms': ordered[len(ordered) // 2] * 1000,
+        'p95_ms': ordered[min(len(ordered) - 1, int(len(ordered) * 0.95))] * 1000,
+        'max_ms': ordered[-1] * 1000,
+        'ops_per_sec': len(samples) / sum(samples) if sum(samples) else None,
+    }
+
+
+def timed(func, *args, **kwargs):
+    start = time.perf_counter()
+    result = func(*args, **kwargs)
+    return time.perf_counter() - start, result
+
+
+# ---------- engine benchmarks ----------
+
+def bench_engine(sizes, iterations, modes):
+    print("=" * 60)
+    print("ENGINE")
+    print("=" * 60)
+
+    frame = np.zeros((480, 640, 3), dtype=np.uint8)
+    results = []
+
+    for size, mode in [(size, mode) for size in sizes for mode in modes]:
+        gallery = make_gallery(size)
+        engine = SyntheticFaceEngine(os.path.join(WORK_DIR, 'encodings'), gallery, mode)
+        if mode != 'float64':
+            engine.get_gallery()
+        section = list(gallery)[:SECTION_SIZE]
+        section_gallery = {sr_code: gallery[sr_code] for sr_code in section}
+
+        cases = [
+            ('recognize_face', make_probes(gallery, iterations),
+             lambda: engine.recognize_face(frame)),
+            ('recognize_face_in_section', make_probes(section_gallery, iterations),
+             lambda: engine.recognize_face_in_section(frame, section)),
+        ]
+
+        for name, probes, call in cases:
+            samples, correct = [], 0
+            for expected, probe in probes:
+                engine.set_probe(probe)
+                elapsed, result = timed(call)
+                samples.append(elapsed)
+                if isinstance(result, list):
+                    result = result[0] if result else None
+                got = result[0] if result else None
+                correct += got == expected
+
+            entry = {'case': name, 'gallery_size': size, 'mode': mode,
+                     'accuracy': correct / len(probes)}
+            entry.update(summarize(samples))
+            results.append(entry)
+            print(f"{name:<28} gallery={size:<7} mode={mode:<8} "
+                  f"mean={entry['mean_ms']:.3f}ms p95={entry['p95_ms']:.3f}ms "
+                  f"accuracy={entry['accuracy']:.3f}")
+
+    return results
+
+
+# ---------- gallery memory and accuracy ----------
+
+def dict_gallery_bytes(gallery):
+    """Approximate size of the legacy {sr_code: float64 array} gallery"""
+    return sys.getsizeof(gallery) + sum(
+        sys.getsizeof(sr_code) + sys.getsizeof(encoding) for sr_code, encoding in gallery.items())
+
+
+def engine_bytes(engine):
+    """Approximate bytes an engine keeps in memory for its known faces, in any mode"""
+    total = dict_gallery_bytes(engine.known_encodings) + sys.getsizeof(engine.known_sr_codes)
+    if engine.gallery is not None:
+        total += engine.gallery.memory_bytes()
+    return total
+
+
+def bench_gallery(sizes, iterations, modes, tolerance=0.6):
+    print("\n" + "=" * 60)
+    print("GALLERY")
+    print("=" * 60)
+
+    results = []
+
+    for size, kind in [(size, kind) for size in sizes for kind in ('random', 'clustered')]:
+        if kind == 'clustered':
+            gallery, strangers = make_clustered_gallery(size, seed=5)
+        else:
+            gallery, strangers = make_gallery(size), None
+        sr_codes = list(gallery)
+        exact_matrix = np.array([gallery[c] for c in sr_codes])
+        probes = make_probes(gallery, iterations, seed=4, unknown_fraction=0.3, strangers=strangers)
+
+        # Exact float64 answers to compare every mode against
+        exact = []
+        for _, probe in probes:
+            distances = np.linalg.norm(exact_matrix - probe, axis=1)
+            best = int(np.argmin(distances))
+            exact.append((sr_codes[best], distances[best]))
+
+        for mode in modes:
+            engine = SyntheticFaceEngine(os.path.join(WORK_DIR, 'encodings'), gallery, mode)
+            bytes_used = engine_bytes(engine)
+            if mode == 'float64':
+                answers = exact
+            else:
+                answers = [engine.gallery.search(probe, k=1)[0] for _, probe in probes]
+            del engine
+
+            top1_agreement = np.mean([a[0] == e[0] for a, e in zip(answers, exact)])
+            decision_agreement = np.mean([
+                (a[1] < tolerance) == (e[1] < tolerance) and (a[1] >= tolerance or a[0] == e[0])
+                for a, e in zip(answers, exact)])
+            distance_error = np.mean([abs(a[1] - e[1]) for a, e in zip(answers, exact)])
+
+            entry = {
+                'gallery_size': size,
+                'gallery': kind,
+                'mode': mode,
+                'bytes': int(bytes_used),
+                'bytes_per_10k_students': int(bytes_used / size * 10000),
+                'top1_agreement': float(top1_agreement),
+                'decision_agreement': float(decision_agreement),
+                'mean_distance_error': float(distance_error),
+            }
+            results.append(entry)
+            print(f"gallery={size:<7} {kind:<9} mode={mode:<8} "
+                  f"MB/10k={entry['bytes_per_10k_students'] / 1e6:.2f} "
+                  f"top1={entry['top1_agreement']:.4f} "
+                  f"decision={entry['decision_agreement']:.4f} "
+                  f"dist_err={entry['mean_distance_error']:.2e}")
+
+    return results
+
+
+# ---------- route benchmarks ----------
+
+def seed_database(student_count):
+    """Create one teacher with one section of students"""
+    db.drop_all()
+    db.create_all()
+
+    teacher = Teacher(name='Bench Teacher', email='bench@example.com')
+    teacher.set_password('bench')
+    db.session.add(teacher)
+    db.session.flush()
+
+    section = Section(name='BENCH-1', teacher_id=teacher.id)
+    db.session.add(section)
+    db.session.flush()
+
+    gallery = make_gallery(student_count, seed=2)
+    for sr_code in gallery:
+        db.session.add(Student(sr_code=sr_code, name=f'Student {sr_code}', section_id=section.id))
+    db.session.commit()
+
+    return teacher.id, section.id, gallery
+
+
+def clear_today():
+    """Delete today's attendance (needs an app context)"""
+    Attendance.query.filter_by(date=datetime.now().date()).delete()
+    db.session.commit()
+    # Cached marks would otherwise answer for the deleted rows
+    attendance_marks.reset()
+
+
+def teacher_client(teacher_id):
+    """Test client logged in as the seeded teacher"""
+    client = app.test_client()
+    with client.session_transaction() as sess:
+        sess['user_id'] = teacher_id
+        sess['user_type'] = 'teacher'
+    return client
+
+
+@contextmanager
+def installed_engine(engine):
+    """Let the routes use engine in place of the global one"""
+    # Read the module dict so the real engine is never created (it would
+    # load and create the encodings dir in the working directory)
+    original = vars(face_engine).get('face_engine')
+    face_engine.face_engine = engine
+    try:
+        yield engine
+    finally:
+        if original is None:
+            del face_engine.face_engine
+        else:
+            face_engine.face_engine = original
+
+
+def bench_routes(iterations, student_count):
+    print("\n" + "=" * 60)
+    print("ROUTES")
+    print("=" * 60)
+
+    results = []
+
+    with app.app_context():
+        teacher_id, section_id, gallery = seed_database(student_count)
+        engine = SyntheticFaceEngine(os.path.join(WORK_DIR, 'encodings'), gallery)
+        client = teacher_client(teacher_id)
+
+        def record(name, samples, responses, **extra):
+            entry = {'case': name, 'students': student_count}
+            entry.update(extra)
+            entry['success_rate'] = sum(bool(r.get_json().get('success')) for r in responses) / len(responses)
+            entry.update(summarize(samples))
+            results.append(entry)
+            label = name + ''.join(f' {k}={v}' for k, v in extra.items())
+            print(f"{label:<44} mean={entry['mean_ms']:.3f}ms p95={entry['p95_ms']:.3f}ms "
+                  f"success={entry['success_rate']:.3f}")
+
+        with installed_engine(engine):
+            frame = make_frame()
+            probes = make_probes(gallery, iterations, seed=3, unknown_fraction=0)
+
+            for tracking in (False, True):
+                app.config['FACE_TRACKING_ENABLED'] = tracking
+                engine.end_tracking(f"{teacher_id}:{section_id}")
+                clear_today()
+                samples, responses = [], []
+                for _, probe in probes:
+                    engine.set_probe(probe)
+                    elapsed, response = timed(client.post, '/detect_face_attendance', json={
+                        'image': frame, 'section_id': section_id})
+                    samples.append(elapsed)
+                    responses.append(response)
+                record('detect_face_attendance', samples, responses, tracking=tracking)
+
+            clear_today()
+            sr_codes = list(gallery)
+            statuses = ['present', 'late', 'absent']
+            samples, responses = [], []
+            for i in range(iterations):
+                elapsed, response = timed(client.post, '/mark_attendance', json={
+                    'sr_code': sr_codes[i % len(sr_codes)],
+                    'section_id': section_id,
+                    'status': statuses[i % len(statuses)],
+                    'manual': True})
+                samples.append(elapsed)
+                responses.append(response)
+            record('mark_attendance', samples, responses)
+
+            samples, responses = [], []
+            for _ in range(max(1, iterations // 10)):
+                clear_today()
+                elapsed, response = timed(client.post, '/end_attendance_session', json={
+                    'section_id': section_id})
+                samples.append(elapsed)
+                responses.append(response)
+            record('end_attendance_session', samples, responses)
+
+    return results
+
+
+def bench_routes_concurrent(thread_counts, iterations, student_count):
+    """
+    Throughput of the attendance routes with several clients posting at once
+
+    Each thread has its own test client and sends iterations requests (a
+    tenth of that for end_attendance_session) as fast as it can; all of
+    them start together.
+    """
+    print("\n" + "=" * 60)
+    print("ROUTES (CONCURRENT)")
+    print("=" * 60)
+
+    results = []
+
+    with app.app_context():
+        teacher_id, section_id, gallery = seed_database(student_count)
+    engine = SyntheticFaceEngine(os.path.join(WORK_DIR, 'encodings'), gallery)
+    frame = make_frame()
+    sr_codes = list(gallery)
+    statuses = ['present', 'late', 'absent']
+
+    def send(client, case, worker, i):
+        if case == 'detect_face_attendance':
+            return client.post('/detect_face_attendance', json={
+                'image': frame, 'section_id': section_id})
+        if case == 'mark_attendance':
+            return client.post('/mark_attendance', json={
+                'sr_code': sr_codes[(worker * 7 + i) % len(sr_codes)],
+                'section_id': section_id,
+                'status': statuses[i % len(statuses)],
+                'manual': True})
+        return client.post('/end_attendance_session', json={'section_id': section_id})
+
+    with installed_engine(engine):
+        app.config['FACE_TRACKING_ENABLED'] = False
+        for threads, case in [(threads, case) for threads in thread_counts
+                              for case in ('detect_face_attendance', 'mark_attendance',
+                                           'end_attendance_session')]:
+            with app.app_context():
+                clear_today()
+            requests_per_thread = max(1, iterations // 10) \
+                if case == 'end_attendance_session' else iterations
+            samples, successes, errors = [], [], []
+            lock = threading.Lock()
+            start_line = threading.Barrier(threads + 1)
+
+            def worker(n):
+                try:
+                    client = teacher_client(teacher_id)
+                    probes = make_probes(gallery, requests_per_thread, seed=10 + n, unknown_fraction=0)
+                    mine, ok = [], 0
+                    start_line.wait()
+                    for i, (_, probe) in enumerate(probes):
+                        engine.set_probe(probe)
+                        elapsed, response = timed(send, client, case, n, i)
+                        mine.append(elapsed)
+                        ok += bool((response.get_json() or {}).get('success'))
+                    with lock:
+                        samples.extend(mine)
+                        successes.append(ok)
+                except Exception as e:
+                    with lock:
+                        errors.append(str(e))
+                    start_line.abort()
+
+            workers = [threading.Thread(target=worker, args=(n,)) for n in range(threads)]
+            for t in workers:
+                t.start()
+            try:
+                start_line.wait()
+            except threading.BrokenBarrierError:
+                pass
+            started = time.perf_counter()
+            for t in workers:
+                t.join()
+            wall = time.perf_counter() - started
+
+            if errors or not samples:
+                print(f"{case:<28} threads={threads:<3} failed: {errors[0] if errors else 'no requests'}")
+                continue
+
+            entry = {'case': case, 'threads': threads, 'students': student_count,
+                     'requests': len(samples),
+                     'throughput_rps': len(samples) / wall,
+                     'success_rate': sum(successes) / len(samples)}
+            entry.update(summarize(samples))
+            results.append(entry)
+            print(f"{case:<28} threads={threads:<3} rps={entry['throughput_rps']:.1f} "
+                  f"p50={entry['p50_ms']:.3f}ms p95={entry['p95_ms']:.3f}ms "
+                  f"success={entry['success_rate']:.3f}")
+
+    return results
+
+
+def environment_info():
+    try:
+        commit = subprocess.run(['git', 'rev-parse', 'HEAD'], capture_output=True,
+                                text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        commit = None
+    return {
+        'timestamp': datetime.now().isoformat(timespec='seconds'),
+        'commit': commit,
+        'python': platform.python_version(),
+        'numpy': np.__version__,
+        'platform': platform.platform(),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark recognition and attendance throughput')
+    parser.add_argument('--sizes', default='100,1000,10000',
+                        help='Comma separated gallery sizes for the engine benchmark')
+    parser.add_argument('--modes', default='float64,float32,int8',
+                        help='Comma separated gallery modes to compare')
+    parser.add_argument('--iterations', type=int, default=200,
+                        help='Timed calls per case')
+    parser.add_argument('--students', type=int, default=SECTION_SIZE,
+                        help='Students in the seeded section for the route benchmark')
+    parser.add_argument('--threads', default='1,4,8',
+                        help='Comma separated client thread counts for the concurrent route benchmark')
+    parser.add_argument('--output', default='benchmark_results.json',
+                        help='Where to write the JSON results')
+    args = parser.parse_args()
+
+    sizes = [int(size) for size in args.sizes.split(',') if size]
+    modes = [mode for mode in args.modes.split(',') if mode]
+    thread_counts = [int(threads) for threads in args.threads.split(',') if threads]
+
+    results = {
+        'environment': environment_info(),
+        'engine': bench_engine(sizes, args.iterations, modes),
+        'gallery': bench_gallery(sizes, args.iterations, modes),
+        'routes': bench_routes(args.iterations, args.students),
+        'routes_concurrent': bench_routes_concurrent(thread_counts, args.iterations, args.students),
+    }
+
+    with open(args.output, 'w') as f:
+        json.dump(results, f, indent=2)
+
+    print(f"\nResults written to {args.output}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,4 +1,5 @@
 from flask_sqlalchemy import SQLAlchemy
+from sqlalchemy import case, func
 from datetime import datetime
 from werkzeug.security import generate_password_hash, check_password_hash
 
@@ -83,6 +84,59 @@ class Attendance(db.Model):
     def __repr__(self):
         return f'<Attendance {self.student_id} {self.date} {self.status}>'
 
+# ============ AGGREGATE QUERIES ============
+
+def section_summaries(teacher_id, day):
+    """
+    Sections of a teacher with student count and attendance counts for a day
+    
+    Everything is fetched in one grouped statement instead of loading the
+    students and attendance records of each section.
+    
+    Args:
+        teacher_id: Teacher whose sections to summarize
+        day: Date to count attendance for
+        
+    Returns:
+        list: One dict per section, ordered by section id
+    """
+    student_counts = db.session.query(
+        Student.section_id.label('section_id'),
+        func.count(Student.id).label('total')
+    ).group_by(Student.section_id).subquery()
+    
+    status = func.lower(Attendance.status)
+    attendance_counts = db.session.query(
+        Attendance.section_id.label('section_id'),
+        func.sum(case((status == 'present', 1), else_=0)).label('present'),
+        func.sum(case((status == 'late', 1), else_=0)).label('late'),
+        func.sum(case((status == 'absent', 1), else_=0)).label('absent')
+    ).filter(Attendance.date == day).group_by(Attendance.section_id).subquery()
+    
+    rows = db.session.query(
+        Section.id,
+        Section.name,
+        Section.department,
+        Section.schedule,
+        func.coalesce(student_counts.c.total, 0),
+        func.coalesce(attendance_counts.c.present, 0),
+        func.coalesce(attendance_counts.c.late, 0),
+        func.coalesce(attendance_counts.c.absent, 0)
+    ).outerjoin(student_counts, student_counts.c.section_id == Section.id
+    ).outerjoin(attendance_counts, attendance_counts.c.section_id == Section.id
+    ).filter(Section.teacher_id == teacher_id).order_by(Section.id).all()
+    
+    return [{
+        'id': row[0],
+        'name': row[1],
+        'department': row[2],
+        'schedule': row[3],
+        'total_students': row[4],
+        'present_today': row[5],
+        'late_today': row[6],
+        'absent_today': row[7]
+    } for row in rows]
+
 # ============ DATABASE INITIALIZATION ============
 
 def init_db():
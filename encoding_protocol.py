@@ -0,0 +1,89 @@
+"""
+Encoding Protocol Module for Attendance System
+Compact binary message carrying one face encoding from a kiosk to the server
+
+Layout (little-endian):
+    magic       4 bytes   b'FENC'
+    version     uint8     1
+    reserved    uint8     0
+    id_length   uint16    length of the kiosk id in bytes
+    timestamp   float64   unix time the face was captured
+    encoding    128 x float32
+    kiosk_id    id_length bytes, UTF-8
+
+A message is 528 bytes plus the kiosk id, against roughly 3 KB for the
+same encoding as a JSON list of floats.
+"""
+
+import math
+import struct
+import time
+
+import numpy as np
+
+CONTENT_TYPE = 'application/x-face-encoding'
+MAGIC = b'FENC'
+VERSION = 1
+ENCODING_SIZE = 128
+
+_HEADER = struct.Struct('<4sBBHd')
+_ENCODING = struct.Struct(f'<{ENCODING_SIZE}f')
+
+
+def pack_encoding(encoding, kiosk_id, timestamp=None):
+    """
+    Build a binary message for a face encoding
+
+    Args:
+        encoding: 128-d face encoding
+        kiosk_id: Identifier of the sending kiosk
+        timestamp: Capture time in unix seconds (defaults to now)
+
+    Returns:
+        bytes: Encoded message
+    """
+    encoding = np.asarray(encoding, dtype='<f4').reshape(-1)
+    if encoding.size != ENCODING_SIZE:
+        raise ValueError(f"Expected a {ENCODING_SIZE}-d encoding, got {encoding.size}")
+
+    kiosk_bytes = kiosk_id.encode('utf-8')
+    if timestamp is None:
+        timestamp = time.time()
+
+    header = _HEADER.pack(MAGIC, VERSION, 0, len(kiosk_bytes), timestamp)
+    return header + encoding.tobytes() + kiosk_bytes
+
+
+def unpack_encoding(data):
+    """
+    Parse a binary message produced by pack_encoding
+
+    Args:
+        data: Message bytes
+
+    Returns:
+        tuple: (encoding as float64 array, kiosk_id, timestamp)
+
+    Raises:
+        ValueError: If the message is malformed
+    """
+    if len(data) < _HEADER.size + _ENCODING.size:
+        raise ValueError("Message too short")
+
+    magic, version, _, id_length, timestamp = _HEADER.unpack_from(data)
+    if magic != MAGIC:
+        raise ValueError("Not a face encoding message")
+    if version != VERSION:
+        raise ValueError(f"Unsupported protocol version {version}")
+    if len(data) != _HEADER.size + _ENCODING.size + id_length:
+        raise ValueError("Message length does not match header")
+
+    encoding = np.frombuffer(data, dtype='<f4', count=ENCODING_SIZE, offset=_HEADER.size)
+    kiosk_id = data[_HEADER.size + _ENCODING.size:].decode('utf-8')
+
+    if not np.all(np.isfinite(encoding)):
+        raise ValueError("Encoding contains invalid values")
+    if not math.isfinite(timestamp):
+        raise ValueError("Timestamp is not a finite number")
+
+    return encoding.astype(np.float64), kiosk_id, timestamp
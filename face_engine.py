@@ -0,0 +1,426 @@
+"""
+Face Recognition Module for Attendance System
+Handles encoding generation and face matching
+"""
+
+import os
+import pickle
+import threading
+import numpy as np
+import cv2
+import face_recognition
+from datetime import datetime
+
+from face_tracker import FaceTrackerRegistry
+from gallery import FaceGallery, GALLERY_MODES
+from metrics import metrics, NullMetrics
+from profiler import profiler
+
+class FaceRecognitionEngine:
+    """Face recognition engine for attendance system"""
+    
+    def __init__(self, encodings_dir='encodings', gallery_mode='float32', gallery_service=None,
+                 instrumented=True):
+        """
+        Initialize the face recognition engine
+        
+        Args:
+            encodings_dir: Directory holding one pickled encoding per student;
+                None for an engine that only detects and encodes (no dir is
+                created, nothing is loaded and nothing can be enrolled)
+            gallery_mode: 'float64' to compare against each stored encoding in
+                turn, or 'float32' / 'int8' to match against a compact FaceGallery,
+                which is then the only in-memory copy of the encodings
+            gallery_service: Remote gallery matching is sent to instead (e.g. a
+                recognition_service.ShardedGallery); no encodings are loaded
+                into this process then, new ones are only written to disk
+            instrumented: False to record no metrics and skip the profiler,
+                so the engine writes no metrics/ or profiles/ files (e.g. on
+                a kiosk)
+        """
+        self.encodings_dir = encodings_dir
+        self.tolerance = 0.6
+        self.known_encodings = {}
+        self.known_sr_codes = {}
+        self.trackers = FaceTrackerRegistry()
+        self.gallery_mode = gallery_mode
+        self.gallery = None
+        self.gallery_service = gallery_service
+        self._gallery_lock = threading.Lock()
+        self.instrumented = instrumented
+        self.metrics = metrics if instrumented else NullMetrics()
+        
+        if encodings_dir is None:
+            return
+        
+        # Create encodings directory if it doesn't exist
+        os.makedirs(encodings_dir, exist_ok=True)
+        
+        # Load all known encodings, unless the gallery service holds them
+        if gallery_service is None:
+            self.load_known_encodings()
+    
+    def load_known_encodings(self):
+        """
+        Load all known face encodings from disk
+        
+        In 'float64' mode they are kept in known_encodings; in the compact
+        modes only the FaceGallery built from them is kept.
+        """
+        try:
+            encodings = self._read_encodings()
+            
+            with self._gallery_lock:
+                self.known_sr_codes = {sr_code: sr_code for sr_code in encodings}
+                if self.gallery_mode == 'float64':
+                    self.known_encodings = encodings
+                    self.gallery = None
+                else:
+                    gallery = FaceGallery(self.gallery_mode)
+                    gallery.build(encodings)
+                    self.known_encodings = {}
+                    self.gallery = gallery
+            
+            print(f"Loaded {len(encodings)} face encodings")
+        except Exception as e:
+            print(f"Error loading encodings: {e}")
+    
+    def _read_encodings(self):
+        encodings = {}
+        if self.encodings_dir is None:
+            return encodings
+        for filename in os.listdir(self.encodings_dir):
+            if filename.endswith('.pkl'):
+                sr_code = filename.replace('.pkl', '')
+                with open(os.path.join(self.encodings_dir, filename), 'rb') as f:
+                    encodings[sr_code] = pickle.load(f)
+        return encodings
+    
+    def save_face_encoding(self, image, sr_code):
+        """
+        Extract and save face encoding for a student
+        
+        Args:
+            image: Image file or numpy array
+            sr_code: Student SR code
+            
+        Returns:
+            bool: True if successful, False otherwise
+        """
+        try:
+            if self.encodings_dir is None:
+                print("Error saving face encoding: engine has no encodings directory")
+                return False
+            
+            # Read image if file path is provided
+            if isinstance(image, str):
+                img = cv2.imread(image)
+                if img is None:
+                    return False
+                img = cv2.cvtColor(img, cv2.COLOR_BGR2RGB)
+            else:
+                img = image
+            
+            # Detect faces
+            face_locations = face_recognition.face_locations(img)
+            
+            if not face_locations:
+                return False
+            
+            if len(face_locations) > 1:
+                print("Multiple faces detected. Using the first one.")
+            
+            # Generate encoding for the first face
+            face_encodings = face_recognition.face_encodings(img, face_locations)
+            
+            if not face_encodings:
+                return False
+            
+            # Save encoding
+            encoding_path = os.path.join(self.encodings_dir, f"{sr_code}.pkl")
+            
+            with open(encoding_path, 'wb') as f:
+                pickle.dump(face_encodings[0], f)
+            
+            # Update in-memory cache; shards of a gallery service reload from disk
+            if self.gallery_service is None:
+                if self.gallery_mode == 'float64':
+                    self.known_encodings[sr_code] = face_encodings[0]
+                else:
+                    self.get_gallery().add(sr_code, face_encodings[0])
+                self.known_sr_codes[sr_code] = sr_code
+            
+            print(f"Face encoding saved for {sr_code}")
+            return True
+        
+        except Exception as e:
+            print(f"Error saving face encoding: {e}")
+            return False
+    
+    def recognize_face(self, image, known_sr_codes=None):
+        """
+        Recognize faces in an image
+        
+        Args:
+            image: Image file path or numpy array
+            known_sr_codes: List of specific SR codes to match against (optional)
+            
+        Returns:
+            list: List of tuples (sr_code, confidence) for recognized faces
+        """
+        try:
+            # Read image if file path is provided
+            if isinstance(image, str):
+                img = cv2.imread(image)
+                if img is None:
+                    return []
+                img = cv2.cvtColor(img, cv2.COLOR_BGR2RGB)
+            else:
+                img = image
+            
+            # Detect faces
+            face_locations = self.detect_faces(img)
+            face_encodings = self.encode_faces(img, face_locations)
+            
+            if not face_encodings:
+                return []
+            
+            results = []
+            
+            for face_encoding in face_encodings:
+                match = self.match_encoding(face_encoding, known_sr_codes)
+                if match:
+                    results.append(match)
+            
+            return results
+        
+        except Exception as e:
+            print(f"Error recognizing face: {e}")
+            return []
+    
+    def recognize_face_tracked(self, image, session_key, known_sr_codes=None):
+        """
+        Recognize faces in a frame of a continuous camera session
+        
+        Faces are linked to the previous frames of the same session by
+        their boxes, so only new tracks and tracks due for re-verification
+        are encoded and matched; the rest keep the identity they already have.
+        
+        Args:
+            image: Image file path or numpy array
+            session_key: Identifier of the camera session the frame belongs to
+            known_sr_codes: List of specific SR codes to match against (optional)
+            
+        Returns:
+            list: List of tuples (sr_code, confidence) for recognized faces
+        """
+        try:
+            if isinstance(image, str):
+                img = cv2.imread(image)
+                if img is None:
+                    return []
+                img = cv2.cvtColor(img, cv2.COLOR_BGR2RGB)
+            else:
+                img = image
+            
+            face_locations = self.detect_faces(img)
+            tracker = self.trackers.get(session_key)
+            
+            with tracker.lock:
+                tracks = tracker.update(face_locations)
+                
+                pending = [i for i, track in enumerate(tracks) if tracker.needs_encoding(track)]
+                self.metrics.inc('face_tracker_cache_hits_total', len(tracks) - len(pending))
+                self.metrics.inc('face_tracker_cache_misses_total', len(pending))
+                if pending:
+                    face_encodings = self.encode_faces(img, [face_locations[i] for i in pending])
+                    for i, face_encoding in zip(pending, face_encodings):
+                        match = self.match_encoding(face_encoding, known_sr_codes)
+                        sr_code, confidence = match if match else (None, 0.0)
+                        tracker.assign_identity(tracks[i], sr_code, confidence)
+                
+                return [(track.sr_code, track.confidence) for track in tracks if track.sr_code]
+        
+        except Exception as e:
+            print(f"Error recognizing tracked face: {e}")
+            return []
+    
+    def end_tracking(self, session_key):
+        """Forget the tracked faces of a camera session"""
+        self.trackers.discard(session_key)
+    
+    def detect_faces(self, img):
+        """Return face boxes (top, right, bottom, left) found in an RGB image"""
+        if not self.instrumented:
+            return face_recognition.face_locations(img)
+        return self._profiled_detect_faces(img)
+    
+    def encode_faces(self, img, face_locations):
+        """Return a 128-d encoding for each given face box"""
+        if not self.instrumented:
+            return face_recognition.face_encodings(img, face_locations)
+        return self._profiled_encode_faces(img, face_locations)
+    
+    @profiler.profile('engine_detect')
+    def _profiled_detect_faces(self, img):
+        with self.metrics.timer('face_engine_stage_seconds', stage='detect'):
+            return face_recognition.face_locations(img)
+    
+    @profiler.profile('engine_encode')
+    def _profiled_encode_faces(self, img, face_locations):
+        with self.metrics.timer('face_engine_stage_seconds', stage='encode'):
+            return face_recognition.face_encodings(img, face_locations)
+    
+    def match_encoding(self, face_encoding, known_sr_codes=None):
+        """
+        Find the closest known face for an encoding
+        
+        Args:
+            face_encoding: 128-d face encoding
+            known_sr_codes: List of specific SR codes to match against (optional)
+            
+        Returns:
+            tuple: (sr_code, confidence) if within tolerance, None otherwise
+        """
+        with self.metrics.timer('face_engine_stage_seconds', stage='match'):
+            match = self._closest_known_face(face_encoding, known_sr_codes)
+        
+        self.metrics.inc('face_engine_matches_total' if match else 'face_engine_rejections_total')
+        return match
+    
+    def _closest_known_face(self, face_encoding, known_sr_codes):
+        if self.gallery_service is not None or self.gallery_mode != 'float64':
+            gallery = self.gallery_service if self.gallery_service is not None else self.get_gallery()
+            results = gallery.search(face_encoding, known_sr_codes, k=1)
+            if results and results[0][1] < self.tolerance:
+                sr_code, face_distance = results[0]
+                return (sr_code, 1 - face_distance)
+            return None
+        
+        # Use specific SR codes or all known codes
+        sr_codes_to_check = known_sr_codes if known_sr_codes else list(self.known_encodings.keys())
+        
+        matches = {}
+        
+        for sr_code in sr_codes_to_check:
+            if sr_code in self.known_encodings:
+                known_encoding = self.known_encodings[sr_code]
+                
+                # Compare faces
+                face_distance = face_recognition.face_distance([known_encoding], face_encoding)[0]
+                
+                if face_distance < self.tolerance:
+                    confidence = 1 - face_distance
+                    matches[sr_code] = confidence
+        
+        # Find best match
+        if matches:
+            best_match = max(matches, key=matches.get)
+            return (best_match, matches[best_match])
+        
+        return None
+    
+    def recognize_face_in_section(self, image, section_sr_codes):
+        """
+        Recognize a face from a specific section's students
+        
+        Args:
+            image: Image file path or numpy array
+            section_sr_codes: List of SR codes in the section
+            
+        Returns:
+            tuple: (sr_code, confidence) if recognized, None otherwise
+        """
+        results = self.recognize_face(image, section_sr_codes)
+        
+        if results:
+            return results[0]  # Return best match
+        
+        return None
+    
+    def delete_encoding(self, sr_code):
+        """Delete face encoding for a student"""
+        try:
+            if self.encodings_dir is None:
+                return False
+            
+            encoding_path = os.path.join(self.encodings_dir, f"{sr_code}.pkl")
+            
+            if os.path.exists(encoding_path):
+                os.remove(encoding_path)
+                
+                # Remove from cache
+                if sr_code in self.known_encodings:
+                    del self.known_encodings[sr_code]
+                if sr_code in self.known_sr_codes:
+                    del self.known_sr_codes[sr_code]
+                if self.gallery_service is None and self.gallery_mode != 'float64':
+                    self.get_gallery().remove(sr_code)
+                
+                print(f"Face encoding deleted for {sr_code}")
+                return True
+            
+            return False
+        
+        except Exception as e:
+            print(f"Error deleting face encoding: {e}")
+            return False
+    
+    def get_gallery(self):
+        """Return the compact gallery, loading it from disk if needed"""
+        if self.gallery is None:
+            self.load_known_encodings()
+            if self.gallery is None:
+                self.gallery = FaceGallery(self.gallery_mode)
+        return self.gallery
+    
+    def set_gallery_mode(self, mode):
+        """Switch between 'float64', 'float32' and 'int8' matching, reloading the encodings"""
+        if mode == 'float64' or mode in GALLERY_MODES:
+            self.gallery_mode = mode
+            self.load_known_encodings()
+            return True
+        return False
+    
+    def update_tolerance(self, tolerance):
+        """Update face recognition tolerance (0-1)"""
+        if 0 <= tolerance <= 1:
+            self.tolerance = tolerance
+            return True
+        return False
+
+# Global face recognition engine, created on first use so importing the
+# module (e.g. from kiosk_client) does not load or create the encodings dir
+_face_engine_lock = threading.Lock()
+
+def __getattr__(name):
+    global face_engine
+    if name != 'face_engine':
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    with _face_engine_lock:
+        if 'face_engine' not in globals():
+            face_engine = FaceRecognitionEngine()
+    return face_engine
+
+def extract_face_from_frame(frame):
+    """Extract face from a video frame"""
+    try:
+        if frame is None:
+            return None
+        
+        # Convert BGR to RGB
+        rgb_frame = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
+        
+        # Detect faces
+        face_locations = face_recognition.face_locations(rgb_frame)
+        
+        if face_locations:
+            # Return the first face location
+            top, right, bottom, left = face_locations[0]
+            return rgb_frame[top:bottom, left:right]
+        
+        return None
+    
+    except Exception as e:
+        print(f"Error extracting face: {e}")
+        return None
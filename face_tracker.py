@@ -0,0 +1,182 @@
+"""
+Face Tracking Module for Attendance System
+Links face boxes across consecutive frames of a camera session so that
+a face which keeps its place in the shot is encoded once and then only
+re-verified periodically
+"""
+
+import threading
+import time
+
+
+def box_iou(box_a, box_b):
+    """
+    Intersection-over-union of two face boxes
+
+    Args:
+        box_a: (top, right, bottom, left) tuple as returned by face_locations
+        box_b: (top, right, bottom, left) tuple
+
+    Returns:
+        float: Overlap ratio between 0 and 1
+    """
+    top_a, right_a, bottom_a, left_a = box_a
+    top_b, right_b, bottom_b, left_b = box_b
+
+    inter_w = min(right_a, right_b) - max(left_a, left_b)
+    inter_h = min(bottom_a, bottom_b) - max(top_a, top_b)
+    if inter_w <= 0 or inter_h <= 0:
+        return 0.0
+
+    intersection = inter_w * inter_h
+    area_a = (right_a - left_a) * (bottom_a - top_a)
+    area_b = (right_b - left_b) * (bottom_b - top_b)
+    union = area_a + area_b - intersection
+
+    return intersection / union if union > 0 else 0.0
+
+
+class FaceTrack:
+    """A single face followed across consecutive frames"""
+
+    def __init__(self, track_id, location):
+        self.track_id = track_id
+        self.location = location
+        self.sr_code = None
+        self.confidence = 0.0
+        self.frames_since_verify = 0
+        self.missed_frames = 0
+        self.encoded = False
+
+    def needs_encoding(self, reverify_interval, retry_interval):
+        """True if the track has never been encoded or is due to be encoded again"""
+        if not self.encoded:
+            return True
+        if self.sr_code is None:
+            return self.frames_since_verify >= retry_interval
+        return self.frames_since_verify >= reverify_interval
+
+    def __repr__(self):
+        return f'<FaceTrack {self.track_id} {self.sr_code}>'
+
+
+class FaceTracker:
+    """IoU tracker for the faces of one camera session"""
+
+    def __init__(self, iou_threshold=0.3, max_missed_frames=2, reverify_interval=30,
+                 retry_interval=3):
+        """
+        Args:
+            iou_threshold: Minimum overlap to link a box to an existing track
+            max_missed_frames: Frames a track may go unseen before it is dropped
+            reverify_interval: Frames after which an identified track is encoded again
+            retry_interval: Frames after which an unrecognized track is encoded again
+        """
+        self.iou_threshold = iou_threshold
+        self.max_missed_frames = max_missed_frames
+        self.reverify_interval = reverify_interval
+        self.retry_interval = retry_interval
+        self.tracks = []
+        self.last_update = time.time()
+        self.lock = threading.Lock()
+        self._next_id = 1
+
+    def update(self, face_locations):
+        """
+        Link the face boxes of a new frame to existing tracks
+
+        Args:
+            face_locations: List of (top, right, bottom, left) boxes for the frame
+
+        Returns:
+            list: FaceTrack for each box, in the same order as face_locations
+        """
+        self.last_update = time.time()
+
+        # Greedily pair boxes and tracks, highest overlap first
+        candidates = []
+        for box_index, location in enumerate(face_locations):
+            for track in self.tracks:
+                iou = box_iou(location, track.location)
+                if iou >= self.iou_threshold:
+                    candidates.append((iou, box_index, track))
+        candidates.sort(key=lambda c: c[0], reverse=True)
+
+        assigned = [None] * len(face_locations)
+        matched_tracks = set()
+        for iou, box_index, track in candidates:
+            if assigned[box_index] is not None or track.track_id in matched_tracks:
+                continue
+            assigned[box_index] = track
+            matched_tracks.add(track.track_id)
+
+        # Age out tracks that were not seen in this frame
+        survivors = []
+        for track in self.tracks:
+            if track.track_id in matched_tracks:
+                track.missed_frames = 0
+                survivors.append(track)
+            else:
+                track.missed_frames += 1
+                if track.missed_frames <= self.max_missed_frames:
+                    survivors.append(track)
+        self.tracks = survivors
+
+        # Move matched tracks and open new ones for unmatched boxes
+        for box_index, location in enumerate(face_locations):
+            track = assigned[box_index]
+            if track is None:
+                track = FaceTrack(self._next_id, location)
+                self._next_id += 1
+                self.tracks.append(track)
+                assigned[box_index] = track
+            else:
+                track.location = location
+                track.frames_since_verify += 1
+
+        return assigned
+
+    def needs_encoding(self, track):
+        """True if the track has to be encoded and matched in this frame"""
+        return track.needs_encoding(self.reverify_interval, self.retry_interval)
+
+    def assign_identity(self, track, sr_code, confidence):
+        """Record the result of encoding and matching a track"""
+        track.encoded = True
+        track.sr_code = sr_code
+        track.confidence = confidence if sr_code else 0.0
+        track.frames_since_verify = 0
+
+    def reset(self):
+        """Forget all tracks"""
+        self.tracks = []
+
+
+class FaceTrackerRegistry:
+    """Keeps one FaceTracker per camera session and expires idle ones"""
+
+    def __init__(self, idle_timeout=300, **tracker_options):
+        self.idle_timeout = idle_timeout
+        self.tracker_options = tracker_options
+        self._trackers = {}
+        self._lock = threading.Lock()
+
+    def get(self, session_key):
+        """Return the tracker for a session, creating it if needed"""
+        with self._lock:
+            self._expire_idle()
+            tracker = self._trackers.get(session_key)
+            if tracker is None:
+                tracker = FaceTracker(**self.tracker_options)
+                self._trackers[session_key] = tracker
+            return tracker
+
+    def discard(self, session_key):
+        """Drop the tracker for a session that has ended"""
+        with self._lock:
+            self._trackers.pop(session_key, None)
+
+    def _expire_idle(self):
+        cutoff = time.time() - self.idle_timeout
+        for key in [k for k, t in self._trackers.items() if t.last_update < cutoff]:
+            del self._trackers[key]
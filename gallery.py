@@ -0,0 +1,184 @@
+"""
+Face Gallery Module for Attendance System
+Compact, contiguous storage of known face encodings for fast matching
+
+Every mode keeps the encodings as one contiguous (n, 128) float32 row
+store, which is all an engine in a compact mode holds per student.
+
+Modes:
+    float32: the row store plus precomputed squared norms, so the distances
+             to every known face come from one matrix-vector product
+    int8:    an extra copy of the rows quantized to int8 with a per-row
+             scale, scanned a block at a time (a quarter of the bytes read
+             per query); the closest candidates are re-ranked with the
+             float32 rows
+"""
+
+import sys
+import threading
+
+import numpy as np
+
+GALLERY_MODES = ('float32', 'int8')
+
+
+class FaceGallery:
+    """Matrix index over a dict of {sr_code: encoding}"""
+
+    def __init__(self, mode='float32', rerank_candidates=10, block_rows=1024):
+        """
+        Args:
+            mode: 'float32' or 'int8'
+            rerank_candidates: Candidates re-ranked exactly in int8 mode
+            block_rows: Rows of the int8 matrix converted per step of a scan
+        """
+        if mode not in GALLERY_MODES:
+            raise ValueError(f"Unknown gallery mode: {mode}")
+
+        self.mode = mode
+        self.rerank_candidates = rerank_candidates
+        self.block_rows = block_rows
+        self._lock = threading.Lock()
+        self._write_lock = threading.Lock()
+        self._index = {}
+        self._sr_codes = []
+        self._rows = np.zeros((0, 128), dtype=np.float32)
+        self._matrix = self._rows
+        self._scales = np.zeros(0, dtype=np.float32)
+        self._sq_norms = np.zeros(0, dtype=np.float32)
+
+    def build(self, encodings):
+        """
+        Rebuild the index from known encodings
+
+        Args:
+            encodings: dict of {sr_code: 128-d encoding}; not kept
+        """
+        sr_codes = list(encodings)
+        rows = np.array([encodings[c] for c in sr_codes], dtype=np.float32).reshape(-1, 128)
+        with self._write_lock:
+            self._set(sr_codes, rows)
+
+    def add(self, sr_code, encoding):
+        """Add or replace one encoding (copies the arrays, meant for enrollments)"""
+        vector = np.asarray(encoding, dtype=np.float32).reshape(128)
+        with self._write_lock:
+            sr_codes = list(self._sr_codes)
+            if sr_code in self._index:
+                rows = self._rows.copy()
+                rows[self._index[sr_code]] = vector
+            else:
+                sr_codes.append(sr_code)
+                rows = np.vstack([self._rows, vector[None, :]])
+            self._set(sr_codes, rows)
+
+    def remove(self, sr_code):
+        """Remove one encoding; returns False if it was not in the gallery"""
+        with self._write_lock:
+            position = self._index.get(sr_code)
+            if position is None:
+                return False
+            sr_codes = self._sr_codes[:position] + self._sr_codes[position + 1:]
+            self._set(sr_codes, np.delete(self._rows, position, axis=0))
+            return True
+
+    def _set(self, sr_codes, rows):
+        rows = np.ascontiguousarray(rows, dtype=np.float32)
+        sq_norms = np.einsum('ij,ij->i', rows, rows)
+
+        if self.mode == 'int8':
+            scales = np.abs(rows).max(axis=1) / 127.0 if len(rows) else np.zeros(0)
+            scales = np.where(scales > 0, scales, 1.0).astype(np.float32)
+            matrix = np.round(rows / scales[:, None]).astype(np.int8)
+        else:
+            scales = np.zeros(0, dtype=np.float32)
+            matrix = rows
+
+        with self._lock:
+            self._sr_codes = sr_codes
+            self._index = {c: i for i, c in enumerate(sr_codes)}
+            self._rows = rows
+            self._matrix = matrix
+            self._scales = scales
+            self._sq_norms = sq_norms
+
+    def __len__(self):
+        return len(self._sr_codes)
+
+    def __contains__(self, sr_code):
+        return sr_code in self._index
+
+    def memory_bytes(self):
+        """Bytes kept alive by the gallery: its arrays and the SR code list and lookup"""
+        with self._lock:
+            arrays = self._rows.nbytes + self._sq_norms.nbytes + self._scales.nbytes
+            if self._matrix is not self._rows:
+                arrays += self._matrix.nbytes
+            lookups = sys.getsizeof(self._sr_codes) + sys.getsizeof(self._index) + \
+                sum(sys.getsizeof(sr_code) for sr_code in self._sr_codes)
+        return arrays + lookups
+
+    def search(self, face_encoding, sr_codes=None, k=1):
+        """
+        Find the known faces closest to an encoding
+
+        Args:
+            face_encoding: 128-d face encoding
+            sr_codes: Restrict the search to these SR codes (optional)
+            k: Number of results
+
+        Returns:
+            list: Up to k tuples (sr_code, distance), closest first
+        """
+        with self._lock:
+            all_sr_codes = self._sr_codes
+            index = self._index
+            exact_rows, matrix = self._rows, self._matrix
+            scales, sq_norms = self._scales, self._sq_norms
+
+        if sr_codes:
+            positions = np.array([index[c] for c in sr_codes if c in index], dtype=np.intp)
+            matrix, sq_norms = matrix[positions], sq_norms[positions]
+            if self.mode == 'int8':
+                scales = scales[positions]
+        else:
+            positions = None
+
+        if len(sq_norms) == 0:
+            return []
+
+        query = np.asarray(face_encoding, dtype=np.float32)
+        dots = self._int8_dots(matrix, query) * scales if self.mode == 'int8' else matrix @ query
+        sq_distances = sq_norms - 2 * dots + query @ query
+
+        if self.mode == 'int8':
+            candidates = self._closest(sq_distances, max(k, self.rerank_candidates))
+            if positions is not None:
+                candidates = positions[candidates]
+            exact = exact_rows[candidates].astype(np.float64)
+            distances = np.linalg.norm(exact - np.asarray(face_encoding, dtype=np.float64), axis=1)
+            order = np.argsort(distances)[:k]
+            return [(all_sr_codes[candidates[i]], float(distances[i])) for i in order]
+
+        closest = self._closest(sq_distances, k)
+        return [(all_sr_codes[positions[i] if positions is not None else i],
+                 float(np.sqrt(max(sq_distances[i], 0.0)))) for i in closest]
+
+    def _int8_dots(self, matrix, query):
+        """matrix @ query for an int8 matrix, converting one block of rows at a time"""
+        dots = np.empty(len(matrix), dtype=np.float32)
+        block = np.empty((min(self.block_rows, len(matrix)), matrix.shape[1]), dtype=np.float32)
+        for start in range(0, len(matrix), self.block_rows):
+            rows = matrix[start:start + self.block_rows]
+            np.copyto(block[:len(rows)], rows, casting='unsafe')
+            np.matmul(block[:len(rows)], query, out=dots[start:start + len(rows)])
+        return dots
+
+    @staticmethod
+    def _closest(sq_distances, k):
+        k = min(k, len(sq_distances))
+        if k < len(sq_distances):
+            candidates = np.argpartition(sq_distances, k - 1)[:k]
+        else:
+            candidates = np.arange(len(sq_distances))
+        return candidates[np.argsort(sq_distances[candidates])]
@@ -0,0 +1,12 @@
+"""
+Gunicorn settings for the Attendance Management System
+
+Gunicorn reads this file from the working directory; the worker count
+and bind address stay in the Procfile and Dockerfile.
+"""
+
+
+def post_worker_init(worker):
+    """Start the nightly archive and VACUUM thread in each worker"""
+    from app import start_maintenance
+    start_maintenance()
@@ -0,0 +1,146 @@
+#!/usr/bin/env python
+"""
+Kiosk client for the Attendance Management System
+
+Runs face detection and encoding on the kiosk itself with
+FaceRecognitionEngine and sends only the 128-d encoding to the server's
+/api/detect_attendance endpoint, packed with encoding_protocol. The server
+matches it against the gallery without any image processing.
+
+The kiosk waits as long as the server asks before sending the next
+encoding: the next_delay_ms of every response, or Retry-After when the
+server sheds the request with 503.
+
+Usage:
+  python kiosk_client.py --server http://attendance.local:5000 --kiosk-id gate-1
+"""
+
+import argparse
+import json
+import sys
+import time
+import urllib.error
+import urllib.request
+
+import cv2
+
+import encoding_protocol
+from face_engine import FaceRecognitionEngine
+
+
+def send_encoding(server, encoding, kiosk_id, timeout=10):
+    """
+    Post one face encoding to the server
+
+    Returns:
+        dict: Decoded JSON response; for an error response without a
+            next_delay_ms, its Retry-After is given as next_delay_ms
+    """
+    request = urllib.request.Request(
+        server.rstrip('/') + '/api/detect_attendance',
+        data=encoding_protocol.pack_encoding(encoding, kiosk_id),
+        headers={'Content-Type': encoding_protocol.CONTENT_TYPE},
+        method='POST')
+
+    try:
+        with urllib.request.urlopen(request, timeout=timeout) as response:
+            return json.loads(response.read())
+    except urllib.error.HTTPError as e:
+        try:
+            result = json.loads(e.read())
+        except ValueError:
+            result = None
+        if not isinstance(result, dict):
+            result = {'success': False, 'message': str(e)}
+
+        retry_after = e.headers.get('Retry-After', '')
+        if retry_after.isdigit():
+            result.setdefault('next_delay_ms', int(retry_after) * 1000)
+        return result
+
+
+def run_kiosk(server, kiosk_id, camera=0, interval=2.0, cooldown=5.0):
+    """
+    Capture frames, encode the largest face locally and report it
+
+    Args:
+        server: Base URL of the attendance server
+        kiosk_id: Identifier sent with every encoding
+        camera: OpenCV camera index
+        interval: Seconds between scans when the server gives no delay
+        cooldown: Seconds to pause after a student is marked
+    """
+    # The kiosk only encodes: no gallery of its own, and no metrics or
+    # profiles to write since nothing on the kiosk serves /metrics
+    engine = FaceRecognitionEngine(encodings_dir=None, instrumented=False)
+    capture = cv2.VideoCapture(camera)
+    if not capture.isOpened():
+        print(f"Error opening camera {camera}")
+        return 1
+
+    print(f"Kiosk {kiosk_id} scanning, reporting to {server}")
+
+    try:
+        while True:
+            started = time.time()
+            delay = interval
+            ok, frame = capture.read()
+            if not ok:
+                print("Error reading frame")
+                time.sleep(interval)
+                continue
+
+            rgb_frame = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
+            face_locations = engine.detect_faces(rgb_frame)
+
+            if face_locations:
+                # The student standing closest to the kiosk has the largest box
+                largest = max(face_locations, key=lambda box: (box[2] - box[0]) * (box[1] - box[3]))
+                face_encodings = engine.encode_faces(rgb_frame, [largest])
+
+                if face_encodings:
+                    try:
+                        result = send_encoding(server, face_encodings[0], kiosk_id)
+                    except (urllib.error.URLError, OSError, ValueError) as e:
+                        print(f"Error contacting server: {e}")
+                        result = {'success': False}
+
+                    # The server paces kiosks and backs them off under load
+                    if result.get('next_delay_ms'):
+                        delay = result['next_delay_ms'] / 1000
+
+                    if result.get('success'):
+                        print(f"[OK] {result.get('student_name')} ({result.get('sr_code')}) "
+                              f"{result.get('status')} at {result.get('time_in')}")
+                        time.sleep(max(cooldown, delay))
+                        continue
+                    elif result.get('message'):
+                        print(f"[--] {result['message']}")
+
+            time.sleep(max(0.0, delay - (time.time() - started)))
+
+    except KeyboardInterrupt:
+        pass
+    finally:
+        capture.release()
+
+    return 0
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Attendance kiosk with on-device face encoding')
+    parser.add_argument('--server', default='http://localhost:5000',
+                        help='Base URL of the attendance server')
+    parser.add_argument('--kiosk-id', required=True,
+                        help='Identifier of this kiosk')
+    parser.add_argument('--camera', type=int, default=0,
+                        help='OpenCV camera index')
+    parser.add_argument('--interval', type=float, default=2.0,
+                        help='Seconds between scans')
+    args = parser.parse_args()
+
+    return run_kiosk(args.server, args.kiosk_id, args.camera, args.interval)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,187 @@
+"""
+Load Control Module for Attendance System
+Server-driven scan cadence and priority load shedding for camera clients
+
+Every recognition response carries `next_delay_ms`, the delay the camera
+page should wait before sending its next frame. It grows with the number
+of frames this worker is busy with and with the recent per-frame latency.
+When the worker is overloaded, low priority traffic (entrance kiosks) is
+refused with 503 before high priority traffic (a teacher's classroom
+session) is.
+
+Requests waiting in gunicorn's accept queue are invisible to the worker,
+so the load also counts the time requests spent queued before reaching
+it, taken from the X-Request-Start header the router or proxy sets
+(Heroku's router sets it; with nginx use
+`proxy_set_header X-Request-Start "t=${msec}";`).
+"""
+
+import json
+import math
+import threading
+import time
+from contextlib import contextmanager
+from functools import wraps
+
+from flask import jsonify, make_response, request
+
+from metrics import metrics
+
+CLASSROOM = 'classroom'
+KIOSK = 'kiosk'
+
+DEFAULT_POLICY = {
+    # priority: base delay, delay cap and queue depth at which it is shed
+    CLASSROOM: {'base_delay_ms': 5000, 'max_delay_ms': 15000, 'shed_depth': 16},
+    KIOSK: {'base_delay_ms': 1000, 'max_delay_ms': 10000, 'shed_depth': 4},
+}
+
+
+class LoadController:
+    """Tracks recognition load in this worker and turns it into client hints"""
+
+    def __init__(self, capacity=2, policy=None, latency_smoothing=0.2, extra_depth=None,
+                 queue_time_ttl=10.0):
+        """
+        Args:
+            capacity: Frames this worker can process at once (its thread count)
+            policy: Per-priority delays and shed depths, see DEFAULT_POLICY
+            latency_smoothing: Weight of the newest sample in the latency average
+            extra_depth: Callable returning queued work not seen by track()
+            queue_time_ttl: Seconds a queue time sample counts without a newer one
+        """
+        self.capacity = capacity
+        self.policy = policy or DEFAULT_POLICY
+        self.latency_smoothing = latency_smoothing
+        self.extra_depth = extra_depth
+        self.queue_time_ttl = queue_time_ttl
+        self.in_flight = 0
+        self.latency = 0.0
+        self.queue_time = 0.0
+        self._queue_time_at = 0.0
+        self._lock = threading.Lock()
+
+    def depth(self):
+        """Frames being processed or waiting, including requests still in the accept queue"""
+        extra = self.extra_depth() if self.extra_depth else 0
+        return self.in_flight + extra + self.queued_requests()
+
+    def queued_requests(self):
+        """Requests waiting ahead of this worker, estimated from their queue time"""
+        if self.latency <= 0 or time.time() - self._queue_time_at > self.queue_time_ttl:
+            return 0.0
+        return self.queue_time / self.latency * self.capacity
+
+    def record_queue_time(self, request_start, now=None):
+        """
+        Fold the time a request waited before reaching this worker into the queue time average
+
+        Args:
+            request_start: X-Request-Start header value, epoch time in
+                seconds, milliseconds or microseconds, optionally prefixed "t="
+            now: Current epoch time (defaults to time.time())
+
+        Returns:
+            float: Seconds the request was queued, or None if the header is invalid
+        """
+        now = time.time() if now is None else now
+        try:
+            started = float(request_start.strip().removeprefix('t='))
+        except ValueError:
+            return None
+        if not math.isfinite(started) or started <= 0:
+            return None
+        while started > 1e11:
+            started /= 1000.0
+        # Clamp clock differences between the proxy and this host
+        seconds = min(max(now - started, 0.0), 60.0)
+
+        with self._lock:
+            if now - self._queue_time_at > self.queue_time_ttl:
+                self.queue_time = seconds
+            else:
+                self.queue_time += self.latency_smoothing * (seconds - self.queue_time)
+            self._queue_time_at = now
+        metrics.observe('request_queue_seconds', seconds)
+        return seconds
+
+    def record_latency(self, seconds):
+        """Fold a per-frame processing time into the latency average"""
+        with self._lock:
+            if self.latency == 0.0:
+                self.latency = seconds
+            else:
+                self.latency += self.latency_smoothing * (seconds - self.latency)
+
+    @contextmanager
+    def track(self):
+        """Count the enclosed block as a frame in flight and record its latency"""
+        with self._lock:
+            self.in_flight += 1
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            with self._lock:
+                self.in_flight -= 1
+            self.record_latency(time.perf_counter() - start)
+
+    def recommended_delay(self, priority):
+        """
+        Milliseconds a client of the given priority should wait before its next frame
+
+        With an idle worker this is the priority's base delay. Each frame
+        already queued adds the time it will take to work through it.
+        """
+        rule = self.policy[priority]
+        depth = self.depth()
+        backlog_ms = self.latency * 1000 * depth / self.capacity
+        delay = rule['base_delay_ms'] * (1 + depth / self.capacity) + backlog_ms
+        return int(min(delay, rule['max_delay_ms']))
+
+    def should_shed(self, priority):
+        """True if a new frame of this priority should be refused"""
+        return self.depth() >= self.policy[priority]['shed_depth']
+
+    def managed(self, priority, track=True, shed=True):
+        """
+        Decorator for recognition routes
+
+        Sheds the request when overloaded (unless shed is False), otherwise
+        runs it, tracked as a frame in flight unless track is False, and
+        adds next_delay_ms to its JSON body and an X-Next-Frame-Delay header.
+        """
+        def decorator(f):
+            @wraps(f)
+            def decorated_function(*args, **kwargs):
+                request_start = request.headers.get('X-Request-Start')
+                if request_start:
+                    self.record_queue_time(request_start)
+
+                if shed and self.should_shed(priority):
+                    metrics.inc('recognition_shed_total', priority=priority)
+                    delay = self.policy[priority]['max_delay_ms']
+                    response = jsonify({
+                        'success': False,
+                        'message': 'Server busy, please wait',
+                        'next_delay_ms': delay
+                    })
+                    response.status_code = 503
+                    response.headers['Retry-After'] = str(math.ceil(delay / 1000))
+                    return response
+
+                if track:
+                    with self.track():
+                        response = make_response(f(*args, **kwargs))
+                else:
+                    response = make_response(f(*args, **kwargs))
+
+                delay = self.recommended_delay(priority)
+                body = response.get_json(silent=True)
+                if isinstance(body, dict):
+                    body['next_delay_ms'] = delay
+                    response.set_data(json.dumps(body))
+                response.headers['X-Next-Frame-Delay'] = str(delay)
+                return response
+            return decorated_function
+        return decorator
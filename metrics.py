@@ -0,0 +1,307 @@
+"""
+Metrics Module for Attendance System
+Prometheus-style counters, gauges and histograms for the recognition hot path
+
+Every process keeps its own metrics in memory and writes a snapshot to
+METRICS_DIR (one JSON file per process id) at most every flush_interval
+seconds; a background thread writes changes left over when the process
+goes idle. The /metrics
+endpoint merges the snapshots of all running processes, so a scrape of
+any gunicorn worker reports totals for the whole server. Snapshots of
+exited workers are deleted; Prometheus sees that as a counter reset.
+"""
+
+import json
+import os
+import threading
+import time
+from contextlib import contextmanager
+from functools import wraps
+
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+
+def _label_key(labels):
+    return tuple(sorted((k, str(v)) for k, v in labels.items()))
+
+
+def _format_labels(label_key, extra=()):
+    pairs = list(label_key) + list(extra)
+    if not pairs:
+        return ''
+    return '{' + ','.join(f'{k}="{v}"' for k, v in pairs) + '}'
+
+
+def _pid_alive(pid):
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True
+    return True
+
+
+class MetricsRegistry:
+    """In-process metrics store with file-based aggregation across workers"""
+
+    def __init__(self, metrics_dir=None, flush_interval=1.0, buckets=DEFAULT_BUCKETS):
+        """
+        Args:
+            metrics_dir: Directory shared by all workers for metric snapshots
+            flush_interval: Minimum seconds between snapshot writes
+            buckets: Upper bounds of histogram buckets in seconds
+        """
+        self.metrics_dir = metrics_dir or os.environ.get('METRICS_DIR', 'metrics')
+        self.flush_interval = flush_interval
+        self.buckets = tuple(buckets)
+        self.counters = {}
+        self.gauges = {}
+        self.histograms = {}
+        self._lock = threading.Lock()
+        self._flush_lock = threading.Lock()
+        self._last_flush = 0.0
+        self._dirty = False
+        self._flusher_pid = None
+
+        # A snapshot left by an earlier process with this pid is not ours
+        try:
+            os.remove(os.path.join(self.metrics_dir, f'{os.getpid()}.json'))
+        except OSError:
+            pass
+
+    # ---------- recording ----------
+
+    def inc(self, name, value=1, **labels):
+        """Increase a counter"""
+        key = (name, _label_key(labels))
+        with self._lock:
+            self.counters[key] = self.counters.get(key, 0) + value
+        self._maybe_flush()
+
+    def gauge_add(self, name, value, **labels):
+        """Move a gauge up or down"""
+        key = (name, _label_key(labels))
+        with self._lock:
+            self.gauges[key] = self.gauges.get(key, 0) + value
+        self._maybe_flush()
+
+    def set_gauge(self, name, value, **labels):
+        """Set a gauge to an absolute value"""
+        key = (name, _label_key(labels))
+        with self._lock:
+            self.gauges[key] = value
+        self._maybe_flush()
+
+    def observe(self, name, value, **labels):
+        """Record a value in a histogram"""
+        key = (name, _label_key(labels))
+        with self._lock:
+            histogram = self.histograms.get(key)
+            if histogram is None:
+                histogram = {'buckets': [0] * len(self.buckets), 'sum': 0.0, 'count': 0}
+                self.histograms[key] = histogram
+            for i, bound in enumerate(self.buckets):
+                if value <= bound:
+                    histogram['buckets'][i] += 1
+                    break
+            histogram['sum'] += value
+            histogram['count'] += 1
+        self._maybe_flush()
+
+    @contextmanager
+    def timer(self, name, **labels):
+        """Time the enclosed block into a histogram"""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(name, time.perf_counter() - start, **labels)
+
+    @contextmanager
+    def in_flight(self, name, **labels):
+        """Count the enclosed block in a gauge while it runs"""
+        self.gauge_add(name, 1, **labels)
+        try:
+            yield
+        finally:
+            self.gauge_add(name, -1, **labels)
+
+    # ---------- aggregation ----------
+
+    def snapshot(self):
+        """Return this process's metrics as a JSON-serializable dict"""
+        with self._lock:
+            return {
+                'pid': os.getpid(),
+                'buckets': list(self.buckets),
+                'counters': [[n, list(map(list, l)), v] for (n, l), v in self.counters.items()],
+                'gauges': [[n, list(map(list, l)), v] for (n, l), v in self.gauges.items()],
+                'histograms': [[n, list(map(list, l)), h] for (n, l), h in self.histograms.items()],
+            }
+
+    def flush(self, wait=False):
+        """
+        Write this process's snapshot to the shared metrics directory
+        
+        Args:
+            wait: Wait for a flush running in another thread instead of
+                leaving the write to it
+        """
+        if not self._flush_lock.acquire(blocking=wait):
+            return
+        try:
+            self._dirty = False
+            os.makedirs(self.metrics_dir, exist_ok=True)
+            path = os.path.join(self.metrics_dir, f'{os.getpid()}.json')
+            tmp_path = f'{path}.{threading.get_ident()}.tmp'
+            with open(tmp_path, 'w') as f:
+                json.dump(self.snapshot(), f)
+            os.replace(tmp_path, path)
+            self._last_flush = time.time()
+        except Exception as e:
+            print(f"Error writing metrics: {e}")
+        finally:
+            self._flush_lock.release()
+
+    def _maybe_flush(self):
+        self._dirty = True
+        if self._flusher_pid != os.getpid():
+            self._start_flusher()
+        if time.time() - self._last_flush >= self.flush_interval:
+            self.flush()
+
+    def _start_flusher(self):
+        # One thread per process; a forked worker starts its own
+        with self._lock:
+            if self._flusher_pid == os.getpid():
+                return
+            self._flusher_pid = os.getpid()
+        threading.Thread(target=self._flush_loop, name='metrics-flush', daemon=True).start()
+
+    def _flush_loop(self):
+        while True:
+            time.sleep(self.flush_interval)
+            if self._dirty:
+                self.flush(wait=True)
+
+    def collect(self):
+        """
+        Merge the snapshots of every running worker
+
+        Snapshots of exited workers are deleted, so a new process that is
+        given the same pid never has stale counters merged in.
+
+        Returns:
+            dict: counters, gauges and histograms keyed by (name, labels)
+        """
+        self.flush(wait=True)
+
+        counters, gauges, histograms = {}, {}, {}
+        buckets = list(self.buckets)
+
+        for filename in os.listdir(self.metrics_dir):
+            if not filename.endswith('.json'):
+                continue
+            path = os.path.join(self.metrics_dir, filename)
+            try:
+                with open(path) as f:
+                    data = json.load(f)
+            except (OSError, ValueError):
+                continue
+
+            if not _pid_alive(data['pid']):
+                try:
+                    os.remove(path)
+                except OSError:
+                    pass
+                continue
+
+            for name, labels, value in data['counters']:
+                key = (name, tuple(map(tuple, labels)))
+                counters[key] = counters.get(key, 0) + value
+
+            for name, labels, value in data['gauges']:
+                key = (name, tuple(map(tuple, labels)))
+                gauges[key] = gauges.get(key, 0) + value
+
+            if data['buckets'] != buckets:
+                continue
+            for name, labels, hist in data['histograms']:
+                key = (name, tuple(map(tuple, labels)))
+                merged = histograms.setdefault(
+                    key, {'buckets': [0] * len(buckets), 'sum': 0.0, 'count': 0})
+                merged['buckets'] = [a + b for a, b in zip(merged['buckets'], hist['buckets'])]
+                merged['sum'] += hist['sum']
+                merged['count'] += hist['count']
+
+        return {'counters': counters, 'gauges': gauges, 'histograms': histograms}
+
+    def render(self):
+        """Render the merged metrics in the Prometheus text exposition format"""
+        data = self.collect()
+        lines = []
+
+        for kind, metrics in (('counter', data['counters']), ('gauge', data['gauges'])):
+            seen = set()
+            for (name, labels), value in sorted(metrics.items()):
+                if name not in seen:
+                    lines.append(f'# TYPE {name} {kind}')
+                    seen.add(name)
+                lines.append(f'{name}{_format_labels(labels)} {value}')
+
+        seen = set()
+        for (name, labels), hist in sorted(data['histograms'].items()):
+            if name not in seen:
+                lines.append(f'# TYPE {name} histogram')
+                seen.add(name)
+            cumulative = 0
+            for bound, count in zip(self.buckets, hist['buckets']):
+                cumulative += count
+                lines.append(f'{name}_bucket{_format_labels(labels, [("le", bound)])} {cumulative}')
+            lines.append(f'{name}_bucket{_format_labels(labels, [("le", "+Inf")])} {hist["count"]}')
+            lines.append(f'{name}_sum{_format_labels(labels)} {hist["sum"]}')
+            lines.append(f'{name}_count{_format_labels(labels)} {hist["count"]}')
+
+        return '\n'.join(lines) + '\n'
+
+
+class NullMetrics:
+    """Registry with the recording API of MetricsRegistry that records nothing"""
+
+    def inc(self, name, value=1, **labels):
+        pass
+
+    def gauge_add(self, name, value, **labels):
+        pass
+
+    def set_gauge(self, name, value, **labels):
+        pass
+
+    def observe(self, name, value, **labels):
+        pass
+
+    @contextmanager
+    def timer(self, name, **labels):
+        yield
+
+    @contextmanager
+    def in_flight(self, name, **labels):
+        yield
+
+
+# Initialize global metrics registry
+metrics = MetricsRegistry()
+
+
+def instrument_route(route):
+    """Count frames, in-flight requests and total latency of a recognition route"""
+    def decorator(f):
+        @wraps(f)
+        def decorated_function(*args, **kwargs):
+            metrics.inc('recognition_frames_total', route=route)
+            with metrics.in_flight('recognition_in_flight', route=route):
+                with metrics.timer('recognition_request_seconds', route=route):
+                    return f(*args, **kwargs)
+        return decorated_function
+    return decorator
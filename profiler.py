@@ -0,0 +1,227 @@
+"""
+Profiler Module for Attendance System
+On-demand cProfile captures of recognition and marking requests
+
+Profiling is switched on per profile name (e.g. 'detect_face_attendance')
+or for a random fraction of all profiled calls. The settings live in
+PROFILES_DIR/settings.json so a change reaches every gunicorn worker.
+
+Each capture writes two files to PROFILES_DIR:
+    <id>.prof   cProfile stats, open with pstats or snakeviz
+    <id>.json   name, duration and every SQL statement run, with its timing
+
+When nothing is enabled a profiled call costs one settings lookup. At most
+one capture runs per process at a time; calls arriving meanwhile (and
+profiled calls nested in a captured one) run unprofiled.
+"""
+
+import cProfile
+import json
+import math
+import os
+import random
+import re
+import threading
+import time
+from functools import wraps
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+PROFILE_FILE = re.compile(r'^[\w.-]+\.(prof|json)$')
+
+
+class RequestProfiler:
+    """Sampled cProfile captures with the SQL they issued"""
+
+    def __init__(self, profiles_dir=None, max_profiles=200, settings_ttl=1.0):
+        """
+        Args:
+            profiles_dir: Directory shared by all workers for settings and captures
+            max_profiles: Captures kept before the oldest are deleted
+            settings_ttl: Seconds the settings file is cached between reads
+        """
+        self.profiles_dir = profiles_dir or os.environ.get('PROFILES_DIR', 'profiles')
+        self.max_profiles = max_profiles
+        self.settings_ttl = settings_ttl
+        self._settings = {'names': [], 'sample_rate': 0.0}
+        self._settings_read_at = 0.0
+        self._busy = threading.Lock()
+        self._local = threading.local()
+        self._sql_attached = False
+
+    # ---------- settings ----------
+
+    def _settings_path(self):
+        return os.path.join(self.profiles_dir, 'settings.json')
+
+    def settings(self):
+        """Current settings: {'names': [...], 'sample_rate': 0.0-1.0}"""
+        now = time.monotonic()
+        if now - self._settings_read_at > self.settings_ttl:
+            self._settings_read_at = now
+            try:
+                with open(self._settings_path()) as f:
+                    self._settings = json.load(f)
+            except (OSError, ValueError):
+                pass
+        return self._settings
+
+    def configure(self, names=None, sample_rate=None):
+        """
+        Change which calls are profiled, for all workers
+
+        Args:
+            names: Profile names captured on every call
+            sample_rate: Fraction of all other profiled calls captured
+
+        Returns:
+            dict: The new settings
+
+        Raises:
+            ValueError: If names is not a list of strings or sample_rate is not a number
+        """
+        settings = dict(self.settings())
+        if names is not None:
+            if not isinstance(names, list) or not all(isinstance(name, str) for name in names):
+                raise ValueError("names must be a list of strings")
+            settings['names'] = sorted(set(names))
+        if sample_rate is not None:
+            try:
+                sample_rate = float(sample_rate)
+            except (TypeError, ValueError):
+                raise ValueError("sample_rate must be a number")
+            if not math.isfinite(sample_rate):
+                raise ValueError("sample_rate must be a number")
+            settings['sample_rate'] = min(max(sample_rate, 0.0), 1.0)
+
+        os.makedirs(self.profiles_dir, exist_ok=True)
+        tmp_path = f'{self._settings_path()}.{os.getpid()}.tmp'
+        with open(tmp_path, 'w') as f:
+            json.dump(settings, f)
+        os.replace(tmp_path, self._settings_path())
+
+        self._settings = settings
+        self._settings_read_at = time.monotonic()
+        return settings
+
+    def should_profile(self, name):
+        settings = self.settings()
+        if name in settings['names']:
+            return True
+        return settings['sample_rate'] > 0 and random.random() < settings['sample_rate']
+
+    # ---------- capturing ----------
+
+    def profile(self, name):
+        """Decorator capturing a profile of the wrapped call when enabled for name"""
+        def decorator(f):
+            @wraps(f)
+            def decorated_function(*args, **kwargs):
+                if not self.should_profile(name) or not self._busy.acquire(blocking=False):
+                    return f(*args, **kwargs)
+                try:
+                    return self._capture(name, f, args, kwargs)
+                finally:
+                    self._busy.release()
+            return decorated_function
+        return decorator
+
+    def _capture(self, name, f, args, kwargs):
+        self._attach_sql()
+        self._local.queries = []
+        profile = cProfile.Profile()
+        started_at = time.time()
+        start = time.perf_counter()
+
+        profile.enable()
+        try:
+            return f(*args, **kwargs)
+        finally:
+            profile.disable()
+            seconds = time.perf_counter() - start
+            queries, self._local.queries = self._local.queries, None
+            try:
+                self._save(name, profile, queries, started_at, seconds)
+            except Exception as e:
+                print(f"Error saving profile: {e}")
+
+    def _attach_sql(self):
+        if self._sql_attached:
+            return
+        self._sql_attached = True
+        event.listen(Engine, 'before_cursor_execute', self._before_cursor_execute)
+        event.listen(Engine, 'after_cursor_execute', self._after_cursor_execute)
+
+    def _before_cursor_execute(self, conn, cursor, statement, parameters, context, executemany):
+        if getattr(self._local, 'queries', None) is not None:
+            conn.info.setdefault('profiler_starts', []).append(time.perf_counter())
+
+    def _after_cursor_execute(self, conn, cursor, statement, parameters, context, executemany):
+        queries = getattr(self._local, 'queries', None)
+        starts = conn.info.get('profiler_starts')
+        if queries is not None and starts:
+            queries.append({
+                'statement': statement,
+                'parameters': repr(parameters)[:200],
+                'seconds': time.perf_counter() - starts.pop()
+            })
+
+    def _save(self, name, profile, queries, started_at, seconds):
+        profile_id = f"{time.strftime('%Y%m%d-%H%M%S', time.localtime(started_at))}-{name}-{os.getpid()}-{random.randrange(16 ** 4):04x}"
+        os.makedirs(self.profiles_dir, exist_ok=True)
+        profile.dump_stats(os.path.join(self.profiles_dir, f'{profile_id}.prof'))
+
+        with open(os.path.join(self.profiles_dir, f'{profile_id}.json'), 'w') as f:
+            json.dump({
+                'id': profile_id,
+                'name': name,
+                'started_at': started_at,
+                'seconds': seconds,
+                'sql_count': len(queries),
+                'sql_seconds': sum(q['seconds'] for q in queries),
+                'sql': queries
+            }, f, indent=1)
+
+        self._prune()
+
+    def _prune(self):
+        captures = sorted(filename for filename in os.listdir(self.profiles_dir)
+                          if filename.endswith('.json') and filename != 'settings.json')
+        for filename in captures[:-self.max_profiles]:
+            for suffix in ('.json', '.prof'):
+                try:
+                    os.remove(os.path.join(self.profiles_dir, filename[:-5] + suffix))
+                except OSError:
+                    pass
+
+    # ---------- reading ----------
+
+    def list_profiles(self, limit=100):
+        """Summaries of the newest captures, newest first"""
+        if not os.path.isdir(self.profiles_dir):
+            return []
+        captures = sorted((filename for filename in os.listdir(self.profiles_dir)
+                           if filename.endswith('.json') and filename != 'settings.json'),
+                          reverse=True)[:limit]
+
+        summaries = []
+        for filename in captures:
+            try:
+                with open(os.path.join(self.profiles_dir, filename)) as f:
+                    capture = json.load(f)
+            except (OSError, ValueError):
+                continue
+            capture.pop('sql', None)
+            capture['files'] = [f"{capture['id']}.prof", filename]
+            summaries.append(capture)
+        return summaries
+
+    def is_profile_file(self, filename):
+        """True if filename names a capture file that may be downloaded"""
+        return bool(PROFILE_FILE.match(filename)) and filename != 'settings.json' and \
+            os.path.isfile(os.path.join(self.profiles_dir, filename))
+
+
+# Initialize global profiler
+profiler = RequestProfiler()
@@ -0,0 +1,208 @@
+"""
+Recognition Jobs Module for Attendance System
+Submit/poll processing of camera frames so slow workers never build a backlog
+
+Each camera session has at most one job running. A frame submitted while
+another is running waits in a single pending slot; a newer frame replaces
+it and the older one is marked dropped, so a lagging server always moves
+on to the latest frame.
+
+Job states are written to JOBS_DIR (one JSON file per job) so a poll can be
+answered by any gunicorn worker, not only the one that accepted the frame.
+Every state carries the owner given at submit, and get() with an owner
+hides jobs belonging to someone else.
+"""
+
+import json
+import os
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+
+from metrics import metrics
+
+FINISHED_STATES = ('done', 'dropped', 'failed')
+
+
+class RecognitionJobQueue:
+    """Latest-frame-wins job queue keyed by camera session"""
+
+    def __init__(self, jobs_dir=None, max_workers=2, job_ttl=600):
+        """
+        Args:
+            jobs_dir: Directory shared by all workers for job state files
+            max_workers: Threads processing jobs in this process
+            job_ttl: Seconds finished job files are kept for polling
+        """
+        self.jobs_dir = jobs_dir or os.environ.get('JOBS_DIR', 'jobs')
+        self.job_ttl = job_ttl
+        self._executor = ThreadPoolExecutor(max_workers=max_workers,
+                                            thread_name_prefix='recognition-job')
+        self._lock = threading.Lock()
+        self._sessions = {}
+        self._events = {}
+        self._owners = {}
+        self._last_cleanup = 0.0
+
+        os.makedirs(self.jobs_dir, exist_ok=True)
+
+    def submit(self, session_key, handler, payload, owner=None):
+        """
+        Queue a frame for a camera session
+
+        Args:
+            session_key: Identifier of the camera session
+            handler: Callable taking payload and returning a JSON-serializable result
+            payload: Data for the handler (e.g. the encoded frame)
+            owner: Id of the submitting user, checked when the job is read
+
+        Returns:
+            str: Job id to poll
+        """
+        job_id = uuid.uuid4().hex
+        with self._lock:
+            self._owners[job_id] = owner
+        self._write(job_id, {'status': 'queued', 'session': session_key, 'submitted_at': time.time()})
+        self._write_latest(session_key, job_id)
+        metrics.inc('recognition_jobs_submitted_total')
+
+        with self._lock:
+            self._events[job_id] = threading.Event()
+            slot = self._sessions.setdefault(session_key, {'running': None, 'pending': None})
+
+            if slot['pending'] is not None:
+                self._finish(slot['pending'][0], 'dropped')
+                metrics.gauge_add('recognition_jobs_queued', -1)
+
+            metrics.gauge_add('recognition_jobs_queued', 1)
+            if slot['running'] is None:
+                slot['running'] = job_id
+                self._executor.submit(self._run, session_key, job_id, handler, payload)
+            else:
+                slot['pending'] = (job_id, handler, payload)
+
+        self._maybe_cleanup()
+        return job_id
+
+    def depth(self):
+        """Jobs running or pending in this process"""
+        with self._lock:
+            return sum((slot['running'] is not None) + (slot['pending'] is not None)
+                       for slot in self._sessions.values())
+
+    def get(self, job_id, wait=0, owner=None):
+        """
+        Return the state of a job, waiting up to `wait` seconds for it to finish
+
+        Args:
+            job_id: Id returned by submit
+            wait: Seconds to wait for the job to finish
+            owner: Id of the requesting user; jobs of other owners are hidden
+
+        Returns:
+            dict: Job state, or None if the job is unknown, expired or not owned
+        """
+        deadline = time.time() + wait
+        event = self._events.get(job_id)
+
+        while True:
+            job = self._read(job_id)
+            if job is not None and owner is not None and job.get('owner') != owner:
+                return None
+            remaining = deadline - time.time()
+            if job is None or job['status'] in FINISHED_STATES or remaining <= 0:
+                return job
+
+            # Jobs of this process wake us directly, others are polled from disk
+            if event is not None:
+                event.wait(min(remaining, 1.0))
+            else:
+                time.sleep(min(remaining, 0.1))
+
+    def _run(self, session_key, job_id, handler, payload):
+        try:
+            if self._read_latest(session_key) != job_id:
+                # A newer frame arrived through another worker
+                self._finish(job_id, 'dropped')
+            else:
+                self._write(job_id, {'status': 'running', 'session': session_key})
+                result = handler(payload)
+                self._finish(job_id, 'done', result)
+        except Exception as e:
+            print(f"Error processing recognition job: {e}")
+            self._finish(job_id, 'failed', {'success': False, 'message': str(e)})
+        finally:
+            metrics.gauge_add('recognition_jobs_queued', -1)
+            with self._lock:
+                slot = self._sessions[session_key]
+                slot['running'] = None
+                if slot['pending'] is not None:
+                    next_job_id, next_handler, next_payload = slot['pending']
+                    slot['pending'] = None
+                    slot['running'] = next_job_id
+                    self._executor.submit(self._run, session_key, next_job_id,
+                                          next_handler, next_payload)
+                else:
+                    del self._sessions[session_key]
+
+    def _finish(self, job_id, status, result=None):
+        if status == 'dropped':
+            metrics.inc('recognition_jobs_dropped_total')
+        self._write(job_id, {'status': status, 'result': result, 'finished_at': time.time()})
+        self._owners.pop(job_id, None)
+        event = self._events.pop(job_id, None)
+        if event is not None:
+            event.set()
+
+    # ---------- shared state on disk ----------
+
+    def _path(self, name):
+        return os.path.join(self.jobs_dir, name)
+
+    def _write(self, job_id, state):
+        path = self._path(f'{job_id}.json')
+        tmp_path = f'{path}.{threading.get_ident()}.tmp'
+        with open(tmp_path, 'w') as f:
+            json.dump(dict(state, job_id=job_id, owner=self._owners.get(job_id)), f)
+        os.replace(tmp_path, path)
+
+    def _read(self, job_id):
+        if not job_id.isalnum():
+            return None
+        try:
+            with open(self._path(f'{job_id}.json')) as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return None
+
+    def _latest_path(self, session_key):
+        return self._path('latest-' + uuid.uuid5(uuid.NAMESPACE_URL, session_key).hex)
+
+    def _write_latest(self, session_key, job_id):
+        path = self._latest_path(session_key)
+        tmp_path = f'{path}.{threading.get_ident()}.tmp'
+        with open(tmp_path, 'w') as f:
+            f.write(job_id)
+        os.replace(tmp_path, path)
+
+    def _read_latest(self, session_key):
+        try:
+            with open(self._latest_path(session_key)) as f:
+                return f.read().strip()
+        except OSError:
+            return None
+
+    def _maybe_cleanup(self):
+        now = time.time()
+        if now - self._last_cleanup < 60:
+            return
+        self._last_cleanup = now
+
+        for filename in os.listdir(self.jobs_dir):
+            path = self._path(filename)
+            try:
+                if now - os.path.getmtime(path) > self.job_ttl:
+                    os.remove(path)
+            except OSError:
+                pass
@@ -0,0 +1,526 @@
+#!/usr/bin/env python
+"""
+Recognition Service Module for Attendance System
+Known faces sharded across processes, queried through one coordinator
+
+Students are grouped into partitions (by department or by section) and the
+partitions are spread over the shards by enrollment count. Each shard is a
+small HTTP server holding a FaceGallery of its partitions' encodings. The
+coordinator, ShardedGallery, has the same search() as FaceGallery: it sends
+the query to the shards owning the requested SR codes (all shards if none
+are given) and merges their top-k results.
+
+The shard map is a JSON file shared by the coordinator and the shards:
+
+    {"version": 3, "by": "department",
+     "shards": ["http://127.0.0.1:7101", ...],
+     "assignment": {"CICS": 0, "CET": 1, ...},
+     "partitions": {"CICS": ["21-00001", ...], ...}}
+
+Rebalancing rewrites it under a lock file (<map>.lock), so concurrent
+rebalances from several workers apply one after another and each bumps
+the version once. Shards reload when their partitions or the modification
+time of any of their encoding files change.
+
+Usage:
+  python recognition_service.py launch --shards 3 --by department
+  python recognition_service.py rebalance
+  python recognition_service.py shard --index 0
+"""
+
+import argparse
+import heapq
+import json
+import os
+import pickle
+import subprocess
+import sys
+import threading
+import time
+import urllib.error
+import urllib.request
+from contextlib import contextmanager
+from concurrent.futures import ThreadPoolExecutor
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlparse
+
+import numpy as np
+
+from gallery import FaceGallery
+from metrics import metrics
+
+PARTITION_KEYS = ('department', 'section')
+UNASSIGNED = 'Unassigned'
+
+
+# ============ SHARD MAP ============
+
+def read_shard_map(map_path):
+    with open(map_path) as f:
+        return json.load(f)
+
+
+def write_shard_map(map_path, shard_map):
+    os.makedirs(os.path.dirname(os.path.abspath(map_path)), exist_ok=True)
+    tmp_path = f'{map_path}.{os.getpid()}.tmp'
+    with open(tmp_path, 'w') as f:
+        json.dump(shard_map, f)
+    os.replace(tmp_path, map_path)
+
+
+@contextmanager
+def shard_map_lock(map_path, timeout=30, stale_after=60):
+    """
+    Hold an exclusive lock on the shard map across processes
+
+    The lock is a file created with O_EXCL next to the map; one left behind
+    by a crashed process is broken after stale_after seconds.
+    """
+    lock_path = f'{map_path}.lock'
+    deadline = time.time() + timeout
+    while True:
+        try:
+            fd = os.open(lock_path, os.O_CREAT | os.O_EXCL | os.O_WRONLY)
+            break
+        except FileExistsError:
+            try:
+                if time.time() - os.path.getmtime(lock_path) > stale_after:
+                    os.remove(lock_path)
+                    continue
+            except OSError:
+                continue
+            if time.time() > deadline:
+                raise TimeoutError(f"Timed out waiting for {lock_path}")
+            time.sleep(0.05)
+    os.close(fd)
+
+    try:
+        yield
+    finally:
+        try:
+            os.remove(lock_path)
+        except OSError:
+            pass
+
+
+def enrollment_partitions(by='department'):
+    """
+    Group enrolled students' SR codes by department or section
+
+    Must run inside an application context.
+
+    Returns:
+        dict: {partition key: [sr_code, ...]}
+    """
+    from database import db, Student
+
+    if by not in PARTITION_KEYS:
+        raise ValueError(f"Unknown partition key: {by}")
+
+    column = Student.department if by == 'department' else Student.section_id
+    partitions = {}
+    for sr_code, value in db.session.query(Student.sr_code, column).all():
+        if value is None:
+            key = UNASSIGNED
+        else:
+            key = value if by == 'department' else f'section-{value}'
+        partitions.setdefault(key, []).append(sr_code)
+    return partitions
+
+
+def plan_shards(partitions, shard_count, previous=None, tolerance=0.2):
+    """
+    Assign partitions to shards by enrollment count
+
+    Partitions keep their previous shard where possible. New partitions go
+    to the least loaded shard, and partitions are moved off a shard only
+    while it holds more than (1 + tolerance) times the average.
+
+    Args:
+        partitions: {partition key: [sr_code, ...]}
+        shard_count: Number of shards
+        previous: Earlier {partition key: shard index} (optional)
+        tolerance: Allowed overload before partitions are moved
+
+    Returns:
+        dict: {partition key: shard index}
+    """
+    sizes = {key: len(sr_codes) for key, sr_codes in partitions.items()}
+    assignment = {key: index for key, index in (previous or {}).items()
+                  if key in sizes and index < shard_count}
+
+    loads = [0] * shard_count
+    for key, index in assignment.items():
+        loads[index] += sizes[key]
+
+    for key in sorted(set(sizes) - set(assignment), key=lambda k: -sizes[k]):
+        index = loads.index(min(loads))
+        assignment[key] = index
+        loads[index] += sizes[key]
+
+    limit = max(1.0, sum(loads) / shard_count * (1 + tolerance))
+    while True:
+        heavy = loads.index(max(loads))
+        light = loads.index(min(loads))
+        if loads[heavy] <= limit:
+            break
+
+        # Only moves that leave both shards below the current maximum
+        movable = [key for key, index in assignment.items()
+                   if index == heavy and loads[light] + sizes[key] < loads[heavy]]
+        if not movable:
+            break
+
+        key = max(movable, key=sizes.get)
+        assignment[key] = light
+        loads[heavy] -= sizes[key]
+        loads[light] += sizes[key]
+
+    return assignment
+
+
+def shard_sr_codes(shard_map, index):
+    """SR codes of all partitions assigned to a shard"""
+    return [sr_code
+            for key, shard_index in shard_map['assignment'].items() if shard_index == index
+            for sr_code in shard_map['partitions'].get(key, [])]
+
+
+# ============ SHARD ============
+
+class GalleryShard:
+    """One shard of the known faces, served over HTTP"""
+
+    def __init__(self, index, map_path, encodings_dir='encodings', gallery_mode='float32',
+                 poll_interval=5):
+        """
+        Args:
+            index: Position of this shard in the shard map
+            map_path: Path of the shard map
+            encodings_dir: Directory holding one pickled encoding per student
+            gallery_mode: FaceGallery mode of the shard
+            poll_interval: Seconds between checks for map or encoding changes
+        """
+        self.index = index
+        self.map_path = map_path
+        self.encodings_dir = encodings_dir
+        self.poll_interval = poll_interval
+        self.gallery = FaceGallery(gallery_mode)
+        self.version = None
+        self._loaded_state = None
+        self._lock = threading.Lock()
+
+    def _state(self, shard_map):
+        """This shard's SR codes with the mtime of each encoding file (None if missing)"""
+        state = []
+        for sr_code in sorted(shard_sr_codes(shard_map, self.index)):
+            try:
+                mtime = os.stat(os.path.join(self.encodings_dir, f'{sr_code}.pkl')).st_mtime_ns
+            except FileNotFoundError:
+                mtime = None
+            state.append((sr_code, mtime))
+        return tuple(state)
+
+    def reload(self, force=False):
+        """
+        Rebuild the gallery if this shard's partitions or encoding files changed
+
+        Encodings rewritten in place are caught by their own mtime; a shard
+        whose faces are unchanged only takes the new map version.
+        """
+        with self._lock:
+            shard_map = read_shard_map(self.map_path)
+            state = self._state(shard_map)
+            if not force and state == self._loaded_state:
+                self.version = shard_map['version']
+                return False
+
+            encodings = {}
+            for sr_code, mtime in state:
+                if mtime is not None:
+                    with open(os.path.join(self.encodings_dir, f'{sr_code}.pkl'), 'rb') as f:
+                        encodings[sr_code] = pickle.load(f)
+
+            self.gallery.build(encodings)
+            self.version = shard_map['version']
+            self._loaded_state = state
+
+        print(f"Shard {self.index} loaded {len(encodings)} face encodings (map version {self.version})")
+        return True
+
+    def serve(self):
+        """Serve searches on the address the shard map lists for this shard"""
+        self.reload(force=True)
+        url = urlparse(read_shard_map(self.map_path)['shards'][self.index])
+
+        handler = type('ShardRequestHandler', (_ShardRequestHandler,), {'shard': self})
+
+        def poll():
+            while True:
+                time.sleep(self.poll_interval)
+                try:
+                    self.reload()
+                except Exception as e:
+                    print(f"Error reloading shard {self.index}: {e}")
+
+        threading.Thread(target=poll, name='shard-reload', daemon=True).start()
+
+        server = ThreadingHTTPServer((url.hostname, url.port), handler)
+        print(f"Shard {self.index} listening on {url.geturl()}")
+        server.serve_forever()
+
+
+class _ShardRequestHandler(BaseHTTPRequestHandler):
+    shard = None
+
+    def do_GET(self):
+        if self.path == '/health':
+            self._reply(200, {'shard': self.shard.index, 'version': self.shard.version,
+                              'faces': len(self.shard.gallery)})
+        else:
+            self._reply(404, {'message': 'Not found'})
+
+    def do_POST(self):
+        try:
+            if self.path == '/search':
+                body = json.loads(self.rfile.read(int(self.headers.get('Content-Length', 0))))
+                results = self.shard.gallery.search(np.asarray(body['encoding'], dtype=np.float64),
+                                                    body.get('sr_codes'), body.get('k', 1))
+                self._reply(200, {'results': results})
+            elif self.path == '/reload':
+                self._reply(200, {'reloaded': self.shard.reload()})
+            else:
+                self._reply(404, {'message': 'Not found'})
+        except Exception as e:
+            self._reply(400, {'message': str(e)})
+
+    def _reply(self, status, body):
+        data = json.dumps(body).encode('utf-8')
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def log_message(self, format, *args):
+        pass
+
+
+# ============ COORDINATOR ============
+
+class ShardedGallery:
+    """Coordinator with FaceGallery's search() over the shards of a shard map"""
+
+    def __init__(self, map_path, timeout=2.0, max_workers=8):
+        """
+        Args:
+            map_path: Path of the shard map
+            timeout: Seconds to wait for each shard
+            max_workers: Shard requests in flight at once
+        """
+        self.map_path = map_path
+        self.timeout = timeout
+        self._executor = ThreadPoolExecutor(max_workers=max_workers,
+                                            thread_name_prefix='shard-query')
+        self._rebalancer = ThreadPoolExecutor(max_workers=1, thread_name_prefix='shard-rebalance')
+        self._lock = threading.Lock()
+        self._map = None
+        self._map_mtime = None
+        self._owner = {}
+        self._rebalance_pending = False
+
+    def shard_map(self):
+        """The current shard map, re-read when the file changes"""
+        mtime = os.stat(self.map_path).st_mtime_ns
+        with self._lock:
+            if mtime != self._map_mtime:
+                shard_map = read_shard_map(self.map_path)
+                self._owner = {sr_code: index
+                               for key, index in shard_map['assignment'].items()
+                               for sr_code in shard_map['partitions'].get(key, [])}
+                self._map = shard_map
+                self._map_mtime = mtime
+            return self._map, self._owner
+
+    def search(self, face_encoding, sr_codes=None, k=1):
+        """
+        Find the known faces closest to an encoding across all shards
+
+        Args:
+            face_encoding: 128-d face encoding
+            sr_codes: Restrict the search to these SR codes (optional); only
+                the shards owning them are queried
+            k: Number of results
+
+        Returns:
+            list: Up to k tuples (sr_code, distance), closest first
+        """
+        shard_map, owner = self.shard_map()
+
+        if sr_codes:
+            targets = {}
+            for sr_code in sr_codes:
+                if sr_code in owner:
+                    targets.setdefault(owner[sr_code], []).append(sr_code)
+        else:
+            targets = {index: None for index in range(len(shard_map['shards']))}
+
+        encoding = [float(x) for x in face_encoding]
+        futures = {index: self._executor.submit(self._query, shard_map['shards'][index],
+                                                encoding, subset, k)
+                   for index, subset in targets.items()}
+
+        results = []
+        with metrics.timer('recognition_shard_fanout_seconds'):
+            for index, future in futures.items():
+                try:
+                    results.extend(future.result())
+                except Exception as e:
+                    print(f"Error querying shard {index}: {e}")
+                    metrics.inc('recognition_shard_errors_total', shard=str(index))
+
+        return heapq.nsmallest(k, results, key=lambda result: result[1])
+
+    def _query(self, url, encoding, sr_codes, k):
+        request = urllib.request.Request(
+            url + '/search',
+            data=json.dumps({'encoding': encoding, 'sr_codes': sr_codes, 'k': k}).encode('utf-8'),
+            headers={'Content-Type': 'application/json'},
+            method='POST')
+        with urllib.request.urlopen(request, timeout=self.timeout) as response:
+            return [(sr_code, distance) for sr_code, distance in json.loads(response.read())['results']]
+
+    def request_rebalance(self, app):
+        """
+        Rebalance in the background after enrollments changed
+
+        Requests arriving before a queued rebalance starts are merged into it.
+
+        Args:
+            app: Flask app whose context the enrollments are read in
+        """
+        with self._lock:
+            if self._rebalance_pending:
+                return
+            self._rebalance_pending = True
+        self._rebalancer.submit(self._run_rebalance, app)
+
+    def _run_rebalance(self, app):
+        with self._lock:
+            self._rebalance_pending = False
+        try:
+            with app.app_context():
+                self.rebalance()
+        except Exception as e:
+            print(f"Error rebalancing recognition shards: {e}")
+
+    def rebalance(self, partitions=None):
+        """
+        Reassign partitions after enrollments changed and tell the shards to reload
+
+        The map is read, re-planned and written under shard_map_lock, so
+        concurrent rebalances never overwrite each other's version.
+        Must run inside an application context unless partitions are given.
+
+        Returns:
+            dict: The new shard map
+        """
+        with shard_map_lock(self.map_path):
+            shard_map = read_shard_map(self.map_path)
+            if partitions is None:
+                partitions = enrollment_partitions(shard_map['by'])
+
+            new_map = dict(shard_map,
+                           version=shard_map['version'] + 1,
+                           assignment=plan_shards(partitions, len(shard_map['shards']),
+                                                  shard_map['assignment']),
+                           partitions=partitions)
+            write_shard_map(self.map_path, new_map)
+
+        for index, url in enumerate(new_map['shards']):
+            try:
+                request = urllib.request.Request(url + '/reload', data=b'', method='POST')
+                urllib.request.urlopen(request, timeout=self.timeout).close()
+            except (OSError, urllib.error.URLError) as e:
+                # The shard picks the change up on its next poll
+                print(f"Shard {index} did not reload: {e}")
+
+        print(f"Rebalanced {len(partitions)} partitions over {len(new_map['shards'])} shards")
+        return new_map
+
+
+# ============ COMMAND LINE ============
+
+def create_shard_map(map_path, shard_count, by='department', host='127.0.0.1', base_port=7100):
+    """Write a shard map for shard_count shards on consecutive local ports"""
+    from app import app
+
+    with app.app_context():
+        partitions = enrollment_partitions(by)
+
+    with shard_map_lock(map_path):
+        previous = None
+        if os.path.exists(map_path):
+            previous = read_shard_map(map_path)
+            if previous['by'] != by or len(previous['shards']) != shard_count:
+                previous = None
+
+        shard_map = {
+            'version': previous['version'] + 1 if previous else 1,
+            'by': by,
+            'shards': [f'http://{host}:{base_port + i + 1}' for i in range(shard_count)],
+            'assignment': plan_shards(partitions, shard_count,
+                                      previous['assignment'] if previous else None),
+            'partitions': partitions,
+        }
+        write_shard_map(map_path, shard_map)
+    return shard_map
+
+
+def launch(map_path, shard_count, by, encodings_dir, gallery_mode, base_port):
+    """Start every shard of a fresh shard map as a local subprocess"""
+    create_shard_map(map_path, shard_count, by, base_port=base_port)
+
+    processes = [subprocess.Popen([sys.executable, os.path.abspath(__file__), 'shard',
+                                   '--index', str(i), '--map', map_path,
+                                   '--encodings', encodings_dir, '--mode', gallery_mode])
+                 for i in range(shard_count)]
+    print(f"Started {shard_count} shards; set RECOGNITION_SHARD_MAP={os.path.abspath(map_path)}")
+
+    try:
+        for process in processes:
+            process.wait()
+    except KeyboardInterrupt:
+        for process in processes:
+            process.terminate()
+        for process in processes:
+            process.wait()
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Sharded face recognition service')
+    parser.add_argument('command', choices=('launch', 'shard', 'rebalance'))
+    parser.add_argument('--map', default=os.environ.get('RECOGNITION_SHARD_MAP', 'shards.json'),
+                        help='Shard map shared by the coordinator and the shards')
+    parser.add_argument('--shards', type=int, default=3, help='Number of shards to launch')
+    parser.add_argument('--by', choices=PARTITION_KEYS, default='department',
+                        help='Partition students by department or section')
+    parser.add_argument('--index', type=int, help='Shard to serve (shard command)')
+    parser.add_argument('--encodings', default='encodings', help='Face encodings directory')
+    parser.add_argument('--mode', default='float32', help='Gallery mode of the shards')
+    parser.add_argument('--base-port', type=int, default=7100, help='Shards use the ports after this')
+    args = parser.parse_args()
+
+    if args.command == 'launch':
+        launch(args.map, args.shards, args.by, args.encodings, args.mode, args.base_port)
+    elif args.command == 'shard':
+        GalleryShard(args.index, args.map, args.encodings, args.mode).serve()
+    else:
+        from app import app
+        with app.app_context():
+            ShardedGallery(args.map).rebalance()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
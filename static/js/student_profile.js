@@ -0,0 +1,558 @@
+// Global variables
+let sessionTimer = 180; // 3 minutes
+let timerInterval = null;
+let subjectChart = null;
+
+// Initialize page
+document.addEventListener('DOMContentLoaded', function() {
+    // Set today's date
+    const today = new Date();
+    document.getElementById('todayDate').textContent =
+        today.toLocaleDateString('en-US', {
+            month: 'long',
+            day: 'numeric',
+            year: 'numeric'
+        });
+
+    // Load student data
+    loadStudentData();
+
+    // Initialize DataTable
+    $('#attendanceRecords').DataTable({
+        pageLength: 10,
+        lengthMenu: [[10, 25, 50, -1], [10, 25, 50, "All"]],
+        order: [[0, 'desc']],
+        language: {
+            search: "_INPUT_",
+            searchPlaceholder: "Search attendance..."
+        }
+    });
+
+    // Populate data
+    populateTodayClasses();
+    populateAttendanceRecords();
+    populateWeeklySchedule();
+    populateSubjects();
+    createSubjectChart();
+
+    // Start time updates
+    updateTime();
+    setInterval(updateTime, 1000);
+
+    // Start session timer
+    startSessionTimer();
+
+    // Setup activity listeners for timer reset
+    setupActivityListeners();
+
+    // Form submission
+    document.getElementById('profileForm').addEventListener('submit', function(e) {
+        e.preventDefault();
+        saveProfileChanges();
+    });
+});
+
+// Load student data
+function loadStudentData() {
+    // Demo data - replace with API call
+    const studentData = {
+        name: "John Doe",
+        srCode: "SR-12345",
+        section: "CS-101",
+        year: "2",
+        department: "Computer Science",
+        email: "john.doe@sr.edu",
+        phone: "+63 912 345 6789",
+        attendanceRate: "92",
+        presentCount: "45",
+        lateCount: "3",
+        absentCount: "2"
+    };
+
+    // Update UI
+    document.getElementById('studentName').textContent = studentData.name;
+    document.getElementById('studentSRCode').textContent = studentData.srCode;
+    document.getElementById('studentSection').textContent = studentData.section;
+    document.getElementById('studentYear').textContent = studentData.year;
+    document.getElementById('studentDepartment').textContent = studentData.department;
+    document.getElementById('studentEmail').textContent = studentData.email;
+    document.getElementById('studentPhone').textContent = studentData.phone;
+
+    document.getElementById('attendanceRate').textContent = studentData.attendanceRate + "%";
+    document.getElementById('presentCount').textContent = studentData.presentCount;
+    document.getElementById('lateCount').textContent = studentData.lateCount;
+    document.getElementById('absentCount').textContent = studentData.absentCount;
+
+    // Create attendance chart
+    createAttendanceChart();
+}
+
+// Update time
+function updateTime() {
+    const now = new Date();
+    const timeString = now.toLocaleTimeString('en-US', {hour12: false});
+    document.getElementById('currentTime').textContent = timeString;
+}
+
+// Tab switching
+function switchTab(tabName) {
+    // Hide all tabs
+    document.querySelectorAll('.tab-content').forEach(tab => {
+        tab.classList.remove('active');
+    });
+
+    // Remove active from all tab buttons
+    document.querySelectorAll('.section-tab').forEach(button => {
+        button.classList.remove('active');
+    });
+
+    // Show selected tab
+    document.getElementById(tabName + 'Tab').classList.add('active');
+
+    // Activate corresponding button
+    document.querySelector(`.section-tab[onclick="switchTab('${tabName}')"]`).classList.add('active');
+}
+
+// Create attendance chart
+function createAttendanceChart() {
+    const chartContainer = document.getElementById('attendanceChart');
+    chartContainer.innerHTML = '';
+
+    // Demo data for the past 7 days
+    const days = ['Mon', 'Tue', 'Wed', 'Thu', 'Fri', 'Sat', 'Sun'];
+    const data = [
+        { present: 3, late: 0, absent: 0 }, // Monday
+        { present: 3, late: 1, absent: 0 }, // Tuesday
+        { present: 2, late: 0, absent: 1 }, // Wednesday
+        { present: 3, late: 0, absent: 0 }, // Thursday
+        { present: 3, late: 1, absent: 0 }, // Friday
+        { present: 1, late: 0, absent: 0 }, // Saturday
+        { present: 0, late: 0, absent: 0 }  // Sunday
+    ];
+
+    const totalWidth = chartContainer.offsetWidth;
+    const barWidth = totalWidth / days.length * 0.6;
+    const gap = totalWidth / days.length * 0.4;
+
+    days.forEach((day, index) => {
+        const dayData = data[index];
+        const total = dayData.present + dayData.late + dayData.absent;
+
+        if (total > 0) {
+            // Calculate heights
+            const presentHeight = (dayData.present / total) * 150;
+            const lateHeight = (dayData.late / total) * 150;
+            const absentHeight = (dayData.absent / total) * 150;
+
+            // Create bars
+            let currentBottom = 0;
+
+            // Present bar
+            if (presentHeight > 0) {
+                const presentBar = document.createElement('div');
+                presentBar.className = 'chart-bar present';
+                presentBar.style.height = presentHeight + 'px';
+                presentBar.style.left = (index * (barWidth + gap)) + 'px';
+                presentBar.style.bottom = currentBottom + 'px';
+                presentBar.title = `${day}: ${dayData.present} present`;
+                chartContainer.appendChild(presentBar);
+                currentBottom += presentHeight;
+            }
+
+            // Late bar
+            if (lateHeight > 0) {
+                const lateBar = document.createElement('div');
+                lateBar.className = 'chart-bar late';
+                lateBar.style.height = lateHeight + 'px';
+                lateBar.style.left = (index * (barWidth + gap)) + 'px';
+                lateBar.style.bottom = currentBottom + 'px';
+                lateBar.title = `${day}: ${dayData.late} late`;
+                chartContainer.appendChild(lateBar);
+                currentBottom += lateHeight;
+            }
+
+            // Absent bar
+            if (absentHeight > 0) {
+                const absentBar = document.createElement('div');
+                absentBar.className = 'chart-bar absent';
+                absentBar.style.height = absentHeight + 'px';
+                absentBar.style.left = (index * (barWidth + gap)) + 'px';
+                absentBar.style.bottom = currentBottom + 'px';
+                absentBar.title = `${day}: ${dayData.absent} absent`;
+                chartContainer.appendChild(absentBar);
+            }
+        }
+    });
+}
+
+// Populate today's classes
+function populateTodayClasses() {
+    const classes = [
+        {
+            time: '08:00 - 10:00',
+            subject: 'CS101 - Introduction to Programming',
+            room: 'Room 301',
+            teacher: 'Prof. Smith',
+            status: 'Present',
+            checkin: '08:05',
+            checkout: '10:00'
+        },
+        {
+            time: '10:00 - 12:00',
+            subject: 'CS102 - Data Structures',
+            room: 'Lab 205',
+            teacher: 'Prof. Johnson',
+            status: 'Upcoming',
+            checkin: '-',
+            checkout: '-'
+        },
+        {
+            time: '13:00 - 15:00',
+            subject: 'MATH101 - Calculus',
+            room: 'Room 102',
+            teacher: 'Prof. Davis',
+            status: 'Upcoming',
+            checkin: '-',
+            checkout: '-'
+        }
+    ];
+
+    const tbody = document.getElementById('todayClasses');
+    tbody.innerHTML = '';
+
+    classes.forEach(cls => {
+        let statusBadge = '';
+        if (cls.status === 'Present') {
+            statusBadge = '<span class="badge-present status-badge">Present</span>';
+        } else if (cls.status === 'Late') {
+            statusBadge = '<span class="badge-late status-badge">Late</span>';
+        } else if (cls.status === 'Absent') {
+            statusBadge = '<span class="badge-absent status-badge">Absent</span>';
+        } else {
+            statusBadge = '<span class="badge bg-secondary">Upcoming</span>';
+        }
+
+        const row = `
+            <tr>
+                <td>${cls.time}</td>
+                <td>${cls.subject}</td>
+                <td>${cls.room}</td>
+                <td>${cls.teacher}</td>
+                <td>${statusBadge}</td>
+                <td>${cls.checkin}</td>
+                <td>${cls.checkout}</td>
+            </tr>
+        `;
+        tbody.innerHTML += row;
+    });
+}
+
+// Populate attendance records
+function populateAttendanceRecords() {
+    const records = [
+        { date: '2023-11-20', day: 'Monday', subject: 'CS101', scheduled: '08:00', checkin: '08:05', checkout: '10:00', status: 'Present', late: '5 min', notes: '' },
+        { date: '2023-11-17', day: 'Friday', subject: 'CS102', scheduled: '10:00', checkin: '10:20', checkout: '12:00', status: 'Late', late: '20 min', notes: 'Traffic' },
+        { date: '2023-11-15', day: 'Wednesday', subject: 'MATH101', scheduled: '13:00', checkin: '-', checkout: '-', status: 'Absent', late: '-', notes: 'Sick' },
+        { date: '2023-11-13', day: 'Monday', subject: 'CS101', scheduled: '08:00', checkin: '08:00', checkout: '10:00', status: 'Present', late: '-', notes: '' },
+        { date: '2023-11-10', day: 'Friday', subject: 'CS102', scheduled: '10:00', checkin: '09:55', checkout: '12:00', status: 'Present', late: '-', notes: '' },
+        { date: '2023-11-08', day: 'Wednesday', subject: 'MATH101', scheduled: '13:00', checkin: '13:05', checkout: '15:00', status: 'Present', late: '5 min', notes: '' }
+    ];
+
+    const tbody = document.querySelector('#attendanceRecords tbody');
+    tbody.innerHTML = '';
+
+    records.forEach(record => {
+        let statusBadge = '';
+        switch(record.status) {
+            case 'Present': statusBadge = 'badge-present'; break;
+            case 'Late': statusBadge = 'badge-late'; break;
+            case 'Absent': statusBadge = 'badge-absent'; break;
+            case 'Excused': statusBadge = 'badge-excused'; break;
+        }
+
+        const row = `
+            <tr>
+                <td>${record.date}</td>
+                <td>${record.day}</td>
+                <td>${record.subject}</td>
+                <td>${record.scheduled}</td>
+                <td>${record.checkin}</td>
+                <td>${record.checkout}</td>
+                <td><span class="${statusBadge} status-badge">${record.status}</span></td>
+                <td>${record.late}</td>
+                <td>${record.notes}</td>
+            </tr>
+        `;
+        tbody.innerHTML += row;
+    });
+}
+
+// Populate weekly schedule
+function populateWeeklySchedule() {
+    const schedule = {
+        '08:00': ['CS101/R301', 'MATH101/R102', 'CS101/R301', 'PHYS101/R201', 'CS102/L205', ''],
+        '10:00': ['', 'CS102/L205', 'MATH101/R102', '', 'CS101/R301', ''],
+        '13:00': ['PHYS101/R201', '', '', 'CS102/L205', '', ''],
+        '15:00': ['', 'PHYS101/R201', '', '', '', '']
+    };
+
+    const tbody = document.getElementById('scheduleTable');
+    tbody.innerHTML = '';
+
+    Object.keys(schedule).forEach(time => {
+        const row = `
+            <tr>
+                <td class="table-secondary fw-bold">${time}</td>
+                <td>${schedule[time][0] || '-'}</td>
+                <td>${schedule[time][1] || '-'}</td>
+                <td>${schedule[time][2] || '-'}</td>
+                <td>${schedule[time][3] || '-'}</td>
+                <td>${schedule[time][4] || '-'}</td>
+                <td>${schedule[time][5] || '-'}</td>
+            </tr>
+        `;
+        tbody.innerHTML += row;
+    });
+}
+
+// Populate subjects
+function populateSubjects() {
+    const subjects = [
+        { code: 'CS101', name: 'Introduction to Programming', teacher: 'Prof. Smith', attendance: '95%', grade: 'A' },
+        { code: 'CS102', name: 'Data Structures', teacher: 'Prof. Johnson', attendance: '87%', grade: 'B+' },
+        { code: 'MATH101', name: 'Calculus', teacher: 'Prof. Davis', attendance: '68%', grade: 'C' },
+        { code: 'PHYS101', name: 'Physics', teacher: 'Prof. Wilson', attendance: '92%', grade: 'A-' }
+    ];
+
+    const container = document.getElementById('subjectsList');
+    container.innerHTML = '';
+
+    subjects.forEach(subject => {
+        const card = `
+            <div class="col-md-6 mb-3">
+                <div class="card h-100">
+                    <div class="card-body">
+                        <h5 class="card-title">${subject.code}</h5>
+                        <h6 class="card-subtitle mb-2 text-muted">${subject.name}</h6>
+                        <p class="card-text">
+                            <small class="text-muted">Teacher: ${subject.teacher}</small>
+                        </p>
+                        <div class="d-flex justify-content-between align-items-center">
+                            <span class="badge ${subject.attendance >= '90' ? 'bg-success' : subject.attendance >= '75' ? 'bg-warning' : 'bg-danger'}">
+                                ${subject.attendance} Attendance
+                            </span>
+                            <span class="badge bg-info">${subject.grade}</span>
+                        </div>
+                        <div class="mt-3">
+                            <button class="btn btn-sm btn-outline-primary w-100" onclick="viewSubjectDetails('${subject.code}')">
+                                <i class="fas fa-chart-line"></i> View Details
+                            </button>
+                        </div>
+                    </div>
+                </div>
+            </div>
+        `;
+        container.innerHTML += card;
+    });
+}
+
+// Create subject chart
+function createSubjectChart() {
+    const ctx = document.getElementById('subjectChart').getContext('2d');
+
+    if (subjectChart) {
+        subjectChart.destroy();
+    }
+
+    subjectChart = new Chart(ctx, {
+        type: 'doughnut',
+        data: {
+            labels: ['CS101', 'CS102', 'MATH101', 'PHYS101'],
+            datasets: [{
+                data: [95, 87, 68, 92],
+                backgroundColor: [
+                    '#27ae60',
+                    '#3498db',
+                    '#e74c3c',
+                    '#f39c12'
+                ],
+                borderWidth: 2,
+                borderColor: '#fff'
+            }]
+        },
+        options: {
+            responsive: true,
+            maintainAspectRatio: false,
+            plugins: {
+                legend: {
+                    position: 'bottom'
+                },
+                tooltip: {
+                    callbacks: {
+                        label: function(context) {
+                            return `${context.label}: ${context.raw}% attendance`;
+                        }
+                    }
+                }
+            }
+        }
+    });
+
+    // Populate subject stats
+    const stats = [
+        { subject: 'CS101', attendance: '95%', present: 19, total: 20 },
+        { subject: 'CS102', attendance: '87%', present: 17, total: 20 },
+        { subject: 'MATH101', attendance: '68%', present: 13, total: 20 },
+        { subject: 'PHYS101', attendance: '92%', present: 11, total: 12 }
+    ];
+
+    const container = document.getElementById('subjectStats');
+    container.innerHTML = '';
+
+    stats.forEach(stat => {
+        const item = `
+            <div class="d-flex justify-content-between align-items-center mb-2">
+                <span>${stat.subject}</span>
+                <div>
+                    <span class="badge ${stat.attendance >= '90' ? 'bg-success' : stat.attendance >= '75' ? 'bg-warning' : 'bg-danger'}">
+                        ${stat.attendance}
+                    </span>
+                    <small class="text-muted ms-2">${stat.present}/${stat.total}</small>
+                </div>
+            </div>
+        `;
+        container.innerHTML += item;
+    });
+}
+
+// Session timer functions
+function startSessionTimer() {
+    document.getElementById('logoutTimer').style.display = 'block';
+    sessionTimer = 180;
+    updateTimerDisplay();
+
+    if (timerInterval) {
+        clearInterval(timerInterval);
+    }
+
+    timerInterval = setInterval(() => {
+        sessionTimer--;
+        updateTimerDisplay();
+
+        if (sessionTimer <= 30) {
+            document.getElementById('logoutTimer').classList.add('timer-warning');
+        }
+
+        if (sessionTimer <= 0) {
+            autoLogout();
+        }
+    }, 1000);
+}
+
+function updateTimerDisplay() {
+    const minutes = Math.floor(sessionTimer / 60);
+    const seconds = sessionTimer % 60;
+    const timeString = `${minutes.toString().padStart(2, '0')}:${seconds.toString().padStart(2, '0')}`;
+    document.getElementById('sessionTimer').textContent = timeString;
+}
+
+function resetTimer() {
+    sessionTimer = 180;
+    document.getElementById('logoutTimer').classList.remove('timer-warning');
+}
+
+function setupActivityListeners() {
+    document.addEventListener('click', resetTimer);
+    document.addEventListener('keypress', resetTimer);
+    document.addEventListener('mousemove', resetTimer);
+}
+
+function autoLogout() {
+    clearInterval(timerInterval);
+    alert('Session expired due to inactivity. For security, you have been logged out.');
+    window.location.href = APP_URLS.studentPortal;
+}
+
+// Action functions
+function takeAttendance() {
+    alert('Redirecting to face scan page...');
+    window.location.href = "/student/scan";
+}
+
+function viewQRCode() {
+    const modal = new bootstrap.Modal(document.getElementById('qrModal'));
+    modal.show();
+}
+
+function downloadQRCode() {
+    alert('Downloading your QR code...\n\nSave it to your phone for quick attendance.');
+}
+
+function printQRCode() {
+    window.print();
+}
+
+function downloadReport() {
+    alert('Downloading attendance report...\n\nThis will generate a PDF report of your attendance records.');
+}
+
+function requestCorrection() {
+    const date = prompt('Enter date for correction (YYYY-MM-DD):', '2023-11-20');
+    const reason = prompt('Enter reason for correction request:');
+
+    if (date && reason) {
+        alert(`Correction request submitted for ${date}.\n\nReason: ${reason}\n\nYour teacher will review this request.`);
+    }
+}
+
+function updateFace() {
+    if (confirm('This will update your face recognition data. You will need to take new photos. Continue?')) {
+        alert('Redirecting to face registration page...\n\nPlease make sure you are in a well-lit area.');
+        // window.location.href = "/student/update-face";
+    }
+}
+
+function changeProfilePicture() {
+    alert('Feature coming soon: Upload new profile picture');
+}
+
+function saveProfileChanges() {
+    alert('Profile changes saved successfully!');
+}
+
+function filterAttendance() {
+    alert('Filtering attendance records...');
+    // In real implementation, reload table with filtered data
+}
+
+function exportAttendance() {
+    alert('Exporting attendance records to Excel...');
+}
+
+function showSchedule(view) {
+    if (view === 'weekly') {
+        document.getElementById('weeklySchedule').style.display = 'block';
+        document.getElementById('dailySchedule').style.display = 'none';
+    } else {
+        document.getElementById('weeklySchedule').style.display = 'none';
+        document.getElementById('dailySchedule').style.display = 'block';
+    }
+}
+
+function viewSubjectDetails(subjectCode) {
+    alert(`Viewing details for ${subjectCode}\n\nThis would show detailed attendance and grade information.`);
+}
+
+function logout() {
+    if (confirm('Are you sure you want to logout?')) {
+        clearInterval(timerInterval);
+        window.location.href = APP_URLS.studentPortal;
+    }
+}
+
+// Clean up on page unload
+window.addEventListener('beforeunload', function() {
+    if (timerInterval) {
+        clearInterval(timerInterval);
+    }
+});
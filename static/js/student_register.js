@@ -0,0 +1,391 @@
+// Global variables
+let currentStep = 1;
+let srCodeValid = false;
+let captureCount = 0;
+let capturedImages = [];
+let cameraStream = null;
+let studentData = {};
+
+// Step navigation
+function goToStep(step) {
+    // Update current step
+    currentStep = step;
+
+    // Hide all step contents
+    document.querySelectorAll('.step-content').forEach(content => {
+        content.classList.remove('active');
+    });
+
+    // Update step indicators
+    document.querySelectorAll('.step').forEach((stepEl, index) => {
+        stepEl.classList.remove('active', 'completed');
+
+        if (index + 1 === step) {
+            stepEl.classList.add('active');
+        } else if (index + 1 < step) {
+            stepEl.classList.add('completed');
+        }
+    });
+
+    // Show target step content
+    document.getElementById(`step${step}-content`).classList.add('active');
+
+    // Special actions for specific steps
+    if (step === 3) {
+        startCamera();
+    } else if (step === 4) {
+        completeRegistration();
+    }
+}
+
+// SR Code validation
+function validateSRCode() {
+    const srCodeInput = document.getElementById('srCode');
+    const srCode = srCodeInput.value.trim().toUpperCase();
+    const validationDiv = document.getElementById('srCodeValidation');
+    const srCodePattern = /^SR-\d{5}$/;
+
+    // Reset validation
+    validationDiv.style.display = 'none';
+    validationDiv.className = 'validation-message';
+
+    // Check format
+    if (!srCodePattern.test(srCode)) {
+        validationDiv.innerHTML = `
+            <i class="fas fa-times-circle"></i>
+            <strong>Invalid Format:</strong> SR Code must be in SR-##### format (5 digits)
+        `;
+        validationDiv.className = 'validation-message validation-error';
+        validationDiv.style.display = 'block';
+        srCodeValid = false;
+        return;
+    }
+
+    // Show loading
+    srCodeInput.disabled = true;
+    const button = document.querySelector('#step1-content .btn-primary');
+    const originalText = button.innerHTML;
+    button.innerHTML = '<i class="fas fa-spinner fa-spin"></i> Checking...';
+    button.disabled = true;
+
+    // Simulate API call to check if SR Code exists
+    setTimeout(() => {
+        // Demo - check if SR Code is already registered
+        const existingCodes = ['SR-10001', 'SR-10002', 'SR-10003'];
+
+        if (existingCodes.includes(srCode)) {
+            validationDiv.innerHTML = `
+                <i class="fas fa-times-circle"></i>
+                <strong>Already Registered:</strong> This SR Code is already registered
+            `;
+            validationDiv.className = 'validation-message validation-error';
+            validationDiv.style.display = 'block';
+            srCodeValid = false;
+        } else {
+            validationDiv.innerHTML = `
+                <i class="fas fa-check-circle"></i>
+                <strong>Valid SR Code:</strong> ${srCode} is available for registration
+            `;
+            validationDiv.className = 'validation-message validation-success';
+            validationDiv.style.display = 'block';
+            srCodeValid = true;
+
+            // Store SR Code
+            studentData.srCode = srCode;
+
+            // Auto-advance to next step after 1 second
+            setTimeout(() => {
+                goToStep(2);
+            }, 1000);
+        }
+
+        // Reset button
+        button.innerHTML = originalText;
+        button.disabled = false;
+        srCodeInput.disabled = false;
+
+    }, 1500); // Simulate network delay
+}
+
+// Department-Section mapping
+const departmentSections = {
+    'Computer Science': ['CS-101', 'CS-102', 'CS-201', 'CS-202'],
+    'Information Technology': ['IT-101', 'IT-102', 'IT-201', 'IT-202'],
+    'Engineering': ['ENG-101', 'ENG-102', 'ENG-201'],
+    'Business': ['BUS-101', 'BUS-102', 'BUS-201'],
+    'Arts': ['ART-101', 'ART-102'],
+    'Science': ['SCI-101', 'SCI-102'],
+    'Education': ['EDU-101', 'EDU-102']
+};
+
+// Update sections based on department
+document.getElementById('department').addEventListener('change', function() {
+    const department = this.value;
+    const sectionSelect = document.getElementById('section');
+
+    // Clear existing options
+    sectionSelect.innerHTML = '<option value="">Select Section</option>';
+
+    // Add sections for selected department
+    if (department && departmentSections[department]) {
+        departmentSections[department].forEach(section => {
+            const option = document.createElement('option');
+            option.value = section;
+            option.textContent = section;
+            sectionSelect.appendChild(option);
+        });
+    }
+});
+
+// Validate personal information
+function validatePersonalInfo() {
+    const firstName = document.getElementById('firstName').value.trim();
+    const lastName = document.getElementById('lastName').value.trim();
+    const department = document.getElementById('department').value;
+    const section = document.getElementById('section').value;
+
+    // Check required fields
+    if (!firstName || !lastName || !department || !section) {
+        alert('Please fill in all required fields (marked with *)');
+        return;
+    }
+
+    // Store student data
+    studentData.firstName = firstName;
+    studentData.lastName = lastName;
+    studentData.email = document.getElementById('email').value;
+    studentData.phone = document.getElementById('phone').value;
+    studentData.department = department;
+    studentData.section = section;
+    studentData.yearLevel = document.getElementById('yearLevel').value;
+    studentData.semester = document.getElementById('semester').value;
+
+    // Go to face capture step
+    goToStep(3);
+}
+
+// Camera functions
+function startCamera() {
+    // Camera is already streaming from Flask video feed
+    // We just need to ensure it's visible
+    const cameraFeed = document.getElementById('camera-feed');
+    cameraFeed.style.display = 'block';
+
+    // Enable capture button after 1 second
+    setTimeout(() => {
+        document.getElementById('captureButton').disabled = false;
+    }, 1000);
+}
+
+function stopCamera() {
+    // In a real implementation, we would stop the stream
+    // For now, just hide the feed
+    document.getElementById('camera-feed').style.display = 'none';
+}
+
+function switchCamera() {
+    alert('Switching camera... (This feature requires multiple camera support)');
+}
+
+// Face capture
+function captureFace() {
+    if (captureCount >= 3) {
+        alert('You have already captured 3 photos. Click "Complete Registration" to proceed.');
+        return;
+    }
+
+    const captureButton = document.getElementById('captureButton');
+    const captureNumber = captureCount + 1;
+
+    // Disable button during capture
+    captureButton.disabled = true;
+    captureButton.innerHTML = '<i class="fas fa-spinner fa-spin"></i> Capturing...';
+
+    // Simulate capture process
+    setTimeout(() => {
+        // Generate a fake image data URL (in real app, capture from camera)
+        const fakeImageData = `data:image/svg+xml,<svg xmlns="http://www.w3.org/2000/svg" width="200" height="200"><rect width="200" height="200" fill="%23${Math.floor(Math.random()*16777215).toString(16)}"/></svg>`;
+
+        // Store captured image
+        capturedImages.push(fakeImageData);
+
+        // Update preview
+        const previewId = `preview${captureNumber}`;
+        const captureItemId = `capture${captureNumber}`;
+
+        document.getElementById(previewId).src = fakeImageData;
+        document.getElementById(captureItemId).classList.add('active');
+
+        // Show capture preview section
+        document.getElementById('capturePreview').style.display = 'block';
+
+        // Update capture count
+        captureCount++;
+
+        // Update button text
+        captureButton.innerHTML = `<i class="fas fa-camera"></i> Capture Photo ${captureCount + 1}/3`;
+
+        // Re-enable button if not all captured
+        if (captureCount < 3) {
+            captureButton.disabled = false;
+        } else {
+            captureButton.innerHTML = '<i class="fas fa-check"></i> All Photos Captured';
+            // Enable complete button
+            document.getElementById('completeCaptureButton').disabled = false;
+        }
+
+    }, 1000); // Simulate capture delay
+}
+
+function retakeAll() {
+    if (confirm('Are you sure you want to retake all photos?')) {
+        // Reset capture count
+        captureCount = 0;
+        capturedImages = [];
+
+        // Reset previews
+        for (let i = 1; i <= 3; i++) {
+            document.getElementById(`preview${i}`).src = '';
+            document.getElementById(`capture${i}`).classList.remove('active');
+        }
+
+        // Hide capture preview
+        document.getElementById('capturePreview').style.display = 'none';
+
+        // Reset capture button
+        const captureButton = document.getElementById('captureButton');
+        captureButton.innerHTML = '<i class="fas fa-camera"></i> Capture Photo 1/3';
+        captureButton.disabled = false;
+
+        // Disable complete button
+        document.getElementById('completeCaptureButton').disabled = true;
+    }
+}
+
+// Complete face capture
+function completeFaceCapture() {
+    if (captureCount < 3) {
+        alert('Please capture all 3 photos before proceeding.');
+        return;
+    }
+
+    const button = document.getElementById('completeCaptureButton');
+    const spinner = document.getElementById('processingSpinner');
+
+    // Show loading
+    button.disabled = true;
+    button.innerHTML = '<i class="fas fa-spinner fa-spin"></i> Processing...';
+    spinner.style.display = 'block';
+
+    // Simulate face data processing
+    setTimeout(() => {
+        // Store face images in student data
+        studentData.faceImages = capturedImages;
+
+        // Hide spinner
+        spinner.style.display = 'none';
+
+        // Go to completion step
+        goToStep(4);
+
+    }, 3000); // Simulate processing time
+}
+
+// Complete registration
+function completeRegistration() {
+    // Update registration success page with student data
+    document.getElementById('registeredAvatar').textContent =
+        studentData.firstName[0] + studentData.lastName[0];
+    document.getElementById('registeredName').textContent =
+        `${studentData.firstName} ${studentData.lastName}`;
+    document.getElementById('registeredSRCode').textContent = studentData.srCode;
+    document.getElementById('registeredSection').textContent =
+        `${studentData.section} • ${studentData.department}`;
+
+    // Submit form data (in real app, this would be AJAX)
+    document.getElementById('formSrCode').value = studentData.srCode;
+    document.getElementById('formFirstName').value = studentData.firstName;
+    document.getElementById('formLastName').value = studentData.lastName;
+    document.getElementById('formEmail').value = studentData.email || '';
+    document.getElementById('formPhone').value = studentData.phone || '';
+    document.getElementById('formDepartment').value = studentData.department;
+    document.getElementById('formSection').value = studentData.section;
+    document.getElementById('formYearLevel').value = studentData.yearLevel || '1';
+    document.getElementById('formFaceImages').value = JSON.stringify(studentData.faceImages);
+
+    // Auto-submit form after 2 seconds
+    setTimeout(() => {
+        document.getElementById('registrationForm').submit();
+    }, 2000);
+}
+
+// Post-registration actions
+function goToDashboard() {
+    alert('Redirecting to your dashboard...');
+    window.location.href = APP_URLS.studentPortal;
+}
+
+function downloadQRCode() {
+    alert('Downloading your QR code...\n\nSave it to your phone for quick attendance.');
+}
+
+function scanNow() {
+    alert('Opening face scanner...\n\nThis will test if your face recognition is working.');
+    // In real app: window.location.href = "/student/scan";
+}
+
+// Initialize
+document.addEventListener('DOMContentLoaded', function() {
+    // Format SR Code input
+    const srCodeInput = document.getElementById('srCode');
+    srCodeInput.addEventListener('input', function(e) {
+        let value = e.target.value.toUpperCase();
+
+        // Auto-add SR- prefix
+        if (!value.startsWith('SR-')) {
+            if (value.startsWith('SR')) {
+                value = 'SR-' + value.substring(2);
+            } else if (value.length > 0) {
+                value = 'SR-' + value;
+            }
+        }
+
+        // Remove any non-alphanumeric except dash
+        value = value.replace(/[^A-Z0-9-]/g, '');
+
+        // Limit to SR- + 5 digits
+        if (value.length > 8) {
+            value = value.substring(0, 8);
+        }
+
+        e.target.value = value;
+    });
+
+    // Enter key to submit SR Code
+    srCodeInput.addEventListener('keypress', function(e) {
+        if (e.key === 'Enter') {
+            validateSRCode();
+        }
+    });
+
+    // Demo: Auto-fill for testing
+    srCodeInput.value = 'SR-12345';
+    document.getElementById('firstName').value = 'John';
+    document.getElementById('lastName').value = 'Doe';
+    document.getElementById('email').value = 'john.doe@sr.edu';
+    document.getElementById('phone').value = '+63 912 345 6789';
+    document.getElementById('department').value = 'Computer Science';
+
+    // Trigger department change to populate sections
+    document.getElementById('department').dispatchEvent(new Event('change'));
+
+    // Set default section after a delay
+    setTimeout(() => {
+        document.getElementById('section').value = 'CS-101';
+    }, 100);
+});
+
+// Clean up on page unload
+window.addEventListener('beforeunload', function() {
+    stopCamera();
+});
@@ -0,0 +1,23 @@
+// Update time
+function updateTime() {
+    const now = new Date();
+    const timeString = now.toLocaleTimeString('en-US', {hour12: false});
+    const dateString = now.toLocaleDateString('en-US', {
+        weekday: 'long',
+        year: 'numeric',
+        month: 'long',
+        day: 'numeric'
+    });
+
+    document.getElementById('current-time').textContent = timeString;
+    document.getElementById('current-time-large').textContent = timeString;
+    document.getElementById('today-date').textContent = dateString;
+}
+
+setInterval(updateTime, 1000);
+updateTime();
+
+// Auto refresh attendance data every 30 seconds
+setInterval(function() {
+    location.reload();
+}, 30000);
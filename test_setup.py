@@ -5,6 +5,9 @@ Test script to verify the Attendance Management System setup
 
 import os
 import sys
+import tempfile
+from contextlib import contextmanager
+from datetime import date
 
 def test_imports():
     """Test all required imports"""
@@ -62,6 +65,365 @@ def test_app():
         print(f"[FAIL] Flask app configuration failed: {e}")
         return False
 
+@contextmanager
+def count_queries(engine):
+    """Collect the SQL statements executed on an engine"""
+    from sqlalchemy import event
+    
+    statements = []
+    
+    def before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        statements.append(statement)
+    
+    event.listen(engine, 'before_cursor_execute', before_cursor_execute)
+    try:
+        yield statements
+    finally:
+        event.remove(engine, 'before_cursor_execute', before_cursor_execute)
+
+def test_query_counts():
+    """Test that section listings take the same number of queries for any number of sections"""
+    print("\n" + "=" * 60)
+    print("TESTING QUERY COUNTS")
+    print("=" * 60)
+    
+    try:
+        from flask import Flask, session
+        from database import db, section_summaries, Teacher, Student, Section, Attendance
+        import app as attendance_app
+        
+        # Separate app on a scratch database so real data is untouched
+        test_app = Flask(__name__)
+        test_app.config['SQLALCHEMY_DATABASE_URI'] = 'sqlite:///' + os.path.join(tempfile.mkdtemp(), 'test.db')
+        test_app.config['SECRET_KEY'] = 'test'
+        db.init_app(test_app)
+        # Share the real routes and template globals so pages render as in the app
+        test_app.url_map = attendance_app.app.url_map
+        test_app.view_functions = attendance_app.app.view_functions
+        test_app.jinja_env.globals.update(attendance_app.app.jinja_env.globals)
+        
+        all_ok = True
+        with test_app.app_context():
+            db.create_all()
+            today = date.today()
+            
+            teacher = Teacher(name='Query Test', email='query@example.com')
+            teacher.set_password('test')
+            db.session.add(teacher)
+            db.session.commit()
+            teacher_id = teacher.id
+            
+            for section_count in (1, 20):
+                while Section.query.filter_by(teacher_id=teacher_id).count() < section_count:
+                    section = Section(name=f'SEC-{section_count}', teacher_id=teacher_id)
+                    db.session.add(section)
+                    db.session.flush()
+                    for i in range(5):
+                        student = Student(sr_code=f'{section.id:02d}-{i:05d}', name=f'Student {i}',
+                                          section_id=section.id)
+                        db.session.add(student)
+                        db.session.flush()
+                        db.session.add(Attendance(student_id=student.id, section_id=section.id,
+                                                  date=today, status=['present', 'late', 'absent', 'Present', 'late'][i],
+                                                  marked_by='system'))
+                db.session.commit()
+                db.session.expunge_all()
+                
+                with count_queries(db.engine) as statements:
+                    summaries = section_summaries(teacher_id, today)
+                ok = len(statements) == 1 and len(summaries) == section_count
+                ok = ok and all(s['total_students'] == 5 and s['present_today'] == 2 and
+                                s['late_today'] == 2 and s['absent_today'] == 1 for s in summaries)
+                print(f"{'[OK]' if ok else '[FAIL]'} section_summaries with {section_count} sections: "
+                      f"{len(statements)} queries")
+                all_ok = all_ok and ok
+                
+                with test_app.test_request_context():
+                    session['user_id'] = teacher_id
+                    session['user_type'] = 'teacher'
+                    with count_queries(db.engine) as statements:
+                        attendance_app.teacher_sections()
+                ok = len(statements) == 1
+                print(f"{'[OK]' if ok else '[FAIL]'} /teacher_sections with {section_count} sections: "
+                      f"{len(statements)} queries")
+                all_ok = all_ok and ok
+                
+                db.session.expunge_all()
+                with test_app.test_request_context():
+                    session['user_id'] = teacher_id
+                    session['user_type'] = 'teacher'
+                    with count_queries(db.engine) as statements:
+                        html = attendance_app.teacher_dashboard()
+                ok = len(statements) == 2 and f'<h3 class="mb-0">{section_count}</h3>' in html
+                print(f"{'[OK]' if ok else '[FAIL]'} /teacher_dashboard with {section_count} sections: "
+                      f"{len(statements)} queries")
+                all_ok = all_ok and ok
+            
+            db.drop_all()
+        
+        return all_ok
+    except Exception as e:
+        print(f"[FAIL] Query count check failed: {e}")
+        return False
+
+def test_archive():
+    """Test that a closed term is archived and read back through attendance_history()"""
+    print("\n" + "=" * 60)
+    print("TESTING ARCHIVE")
+    print("=" * 60)
+    
+    try:
+        from flask import Flask
+        from database import db, Teacher, Student, Section, Attendance
+        from archive import archive_closed_terms, attendance_history, term_for
+        
+        work_dir = tempfile.mkdtemp()
+        archive_dir = os.path.join(work_dir, 'archive')
+        test_app = Flask(__name__)
+        test_app.config['SQLALCHEMY_DATABASE_URI'] = 'sqlite:///' + os.path.join(work_dir, 'test.db')
+        db.init_app(test_app)
+        
+        all_ok = True
+        with test_app.app_context():
+            db.create_all()
+            today = date.today()
+            closed_day = date(today.year - 1, 3, 15)
+            
+            teacher = Teacher(name='Archive Test', email='archive@example.com')
+            teacher.set_password('test')
+            db.session.add(teacher)
+            db.session.flush()
+            section = Section(name='ARCHIVE-1', teacher_id=teacher.id)
+            db.session.add(section)
+            db.session.flush()
+            student = Student(sr_code='21-00001', name='Archived Student', section_id=section.id)
+            db.session.add(student)
+            db.session.flush()
+            for day, status in ((closed_day, 'late'), (today, 'present')):
+                db.session.add(Attendance(student_id=student.id, section_id=section.id,
+                                          date=day, status=status, marked_by='system'))
+            db.session.commit()
+            student_id = student.id
+            
+            moved = archive_closed_terms(archive_dir, today=today)
+            ok = moved.get(term_for(closed_day)) == 1 and sum(moved.values()) == 1 and Attendance.query.count() == 1
+            print(f"{'[OK]' if ok else '[FAIL]'} Archived closed term: {moved}")
+            all_ok = all_ok and ok
+            
+            records = attendance_history(archive_dir, closed_day, today, student_id=student_id)
+            found = [(r.date, r.status, r.student.sr_code if r.student else None) for r in records]
+            ok = found == [(today, 'present', '21-00001'), (closed_day, 'late', '21-00001')]
+            print(f"{'[OK]' if ok else '[FAIL]'} attendance_history read back {len(records)} records")
+            all_ok = all_ok and ok
+            
+            db.drop_all()
+        
+        return all_ok
+    except Exception as e:
+        print(f"[FAIL] Archive check failed: {e}")
+        return False
+
+def test_face_tracking():
+    """Test that tracked recognition finds and matches a face in a real frame"""
+    print("\n" + "=" * 60)
+    print("TESTING FACE TRACKING")
+    print("=" * 60)
+    
+    try:
+        import cv2
+        import numpy as np
+        from face_engine import FaceRecognitionEngine
+        
+        frame = cv2.imread(os.path.join(os.path.dirname(os.path.abspath(__file__)), 'test_images', 'face.jpg'))
+        frame = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
+        
+        engine = FaceRecognitionEngine(encodings_dir=tempfile.mkdtemp())
+        if not engine.save_face_encoding(frame, '21-00001'):
+            print("[FAIL] No face found to enroll in test_images/face.jpg")
+            return False
+        
+        # Count encodings so frames answered by the tracker can be told apart
+        encoded = []
+        encode_faces = engine.encode_faces
+        engine.encode_faces = lambda img, locations: encoded.extend(locations) or encode_faces(img, locations)
+        
+        all_ok = True
+        for shift in (0, 3, 6):
+            moved = np.roll(frame, shift, axis=1)
+            matches = engine.recognize_face_tracked(moved, 'test-session')
+            ok = [sr_code for sr_code, confidence in matches] == ['21-00001']
+            print(f"{'[OK]' if ok else '[FAIL]'} Frame shifted {shift}px: {matches}")
+            all_ok = all_ok and ok
+        
+        ok = len(encoded) == 1
+        print(f"{'[OK]' if ok else '[FAIL]'} Face encoded {len(encoded)} time(s) over 3 frames")
+        return all_ok and ok
+    except Exception as e:
+        print(f"[FAIL] Face tracking check failed: {e}")
+        return False
+
+def test_attendance_marks():
+    """Test that duplicate, retried and overridden attendance marks are handled once and correctly"""
+    print("\n" + "=" * 60)
+    print("TESTING ATTENDANCE MARKS")
+    print("=" * 60)
+    
+    try:
+        import threading
+        import time
+        from flask import Flask
+        from attendance_marks import MarkCoalescer
+        from database import db, Teacher, Student, Section
+        import app as attendance_app
+        
+        # Concurrent duplicates share one write and its outcome
+        coalescer = MarkCoalescer()
+        writes = []
+        def slow_write():
+            time.sleep(0.2)
+            writes.append(1)
+            return {'write': len(writes)}
+        start_line = threading.Barrier(8)
+        outcomes = []
+        def duplicate():
+            start_line.wait()
+            outcomes.append(coalescer.mark(('face', 1, 1, date.today()), slow_write))
+        threads = [threading.Thread(target=duplicate) for _ in range(8)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        all_ok = len(writes) == 1 and outcomes == [{'write': 1}] * 8
+        print(f"{'[OK]' if all_ok else '[FAIL]'} 8 concurrent duplicate marks ran {len(writes)} write(s)")
+        
+        # Scratch app on a scratch database for the routes
+        test_app = Flask(__name__)
+        test_app.config['SQLALCHEMY_DATABASE_URI'] = 'sqlite:///' + os.path.join(tempfile.mkdtemp(), 'test.db')
+        test_app.config['SECRET_KEY'] = 'test'
+        db.init_app(test_app)
+        test_app.url_map = attendance_app.app.url_map
+        test_app.view_functions = attendance_app.app.view_functions
+        
+        attendance_app.attendance_marks.reset()
+        with test_app.app_context():
+            db.create_all()
+            teacher = Teacher(name='Marks Test', email='marks@example.com')
+            teacher.set_password('test')
+            db.session.add(teacher)
+            db.session.flush()
+            section = Section(name='MARKS-1', teacher_id=teacher.id)
+            db.session.add(section)
+            db.session.flush()
+            student = Student(sr_code='21-00001', name='Student 1', section_id=section.id)
+            db.session.add(student)
+            db.session.commit()
+            teacher_id, section_id, student_id = teacher.id, section.id, student.id
+            
+            client = test_app.test_client()
+            with client.session_transaction() as sess:
+                sess['user_id'] = teacher_id
+                sess['user_type'] = 'teacher'
+            
+            def post_mark(status, request_id):
+                return client.post('/mark_attendance', json={
+                    'sr_code': '21-00001', 'section_id': section_id, 'status': status,
+                    'manual': True, 'request_id': request_id})
+            
+            # A retry gets the first outcome back, even after the status changed
+            first = post_mark('late', 'req-1')
+            post_mark('present', 'req-2')
+            retry = post_mark('late', 'req-1')
+            ok = first.status_code == retry.status_code == 200 and \
+                retry.get_json() == first.get_json() == {'success': True, 'message': 'Attendance marked as late'}
+            print(f"{'[OK]' if ok else '[FAIL]'} Retried request id replayed: {retry.get_json()}")
+            all_ok = all_ok and ok
+            
+            # The same request id for another mark is refused
+            reused = post_mark('absent', 'req-1')
+            ok = reused.status_code == 422
+            print(f"{'[OK]' if ok else '[FAIL]'} Request id reused for another mark: HTTP {reused.status_code}")
+            all_ok = all_ok and ok
+            
+            # A manual mark drops the cached face mark, so the next one reads the database
+            first_face = attendance_app.mark_attendance_for_student(student_id, section_id)
+            post_mark('absent', 'req-3')
+            second_face = attendance_app.mark_attendance_for_student(student_id, section_id)
+            ok = first_face == {'status': 'present', 'already_marked': True} and \
+                second_face == {'status': 'absent', 'already_marked': True}
+            print(f"{'[OK]' if ok else '[FAIL]'} Face mark after a manual mark: {second_face}")
+            all_ok = all_ok and ok
+            
+            db.drop_all()
+        attendance_app.attendance_marks.reset()
+        
+        return all_ok
+    except Exception as e:
+        print(f"[FAIL] Attendance mark check failed: {e}")
+        return False
+
+def test_recognition_jobs():
+    """Test that a camera session only keeps its latest waiting frame"""
+    print("\n" + "=" * 60)
+    print("TESTING RECOGNITION JOBS")
+    print("=" * 60)
+    
+    try:
+        import threading
+        from recognition_jobs import RecognitionJobQueue
+        
+        queue = RecognitionJobQueue(jobs_dir=tempfile.mkdtemp(), max_workers=1)
+        started, release = threading.Event(), threading.Event()
+        handled = []
+        def handler(frame):
+            if frame == 'frame-1':
+                started.set()
+                release.wait(5)
+            handled.append(frame)
+            return {'success': True, 'frame': frame}
+        
+        # Frames 2 and 3 arrive while frame 1 is being processed
+        job_ids = [queue.submit('test-session', handler, 'frame-1')]
+        started.wait(5)
+        job_ids += [queue.submit('test-session', handler, f'frame-{n}') for n in (2, 3)]
+        release.set()
+        states = [queue.get(job_id, wait=5)['status'] for job_id in job_ids]
+        
+        ok = states == ['done', 'dropped', 'done'] and handled == ['frame-1', 'frame-3']
+        print(f"{'[OK]' if ok else '[FAIL]'} Job states {states}, frames handled {handled}")
+        return ok
+    except Exception as e:
+        print(f"[FAIL] Recognition job check failed: {e}")
+        return False
+
+def test_shard_planning():
+    """Test that plan_shards balances partitions and keeps them where they were"""
+    print("\n" + "=" * 60)
+    print("TESTING SHARD PLANNING")
+    print("=" * 60)
+    
+    try:
+        from recognition_service import plan_shards
+        
+        partitions = {f'dept-{n}': [f'{n:02d}-{i:05d}' for i in range(size)]
+                      for n, size in enumerate((50, 40, 30, 20, 10, 10))}
+        
+        assignment = plan_shards(partitions, 3)
+        loads = [sum(len(partitions[key]) for key, index in assignment.items() if index == shard)
+                 for shard in range(3)]
+        all_ok = sorted(assignment) == sorted(partitions) and max(loads) <= 160 / 3 * 1.2
+        print(f"{'[OK]' if all_ok else '[FAIL]'} 6 partitions over 3 shards: loads {loads}")
+        
+        # A new small partition is placed without moving the others
+        partitions['dept-6'] = ['06-00000', '06-00001']
+        replanned = plan_shards(partitions, 3, previous=assignment)
+        moved = [key for key in assignment if replanned[key] != assignment[key]]
+        ok = not moved and 'dept-6' in replanned
+        print(f"{'[OK]' if ok else '[FAIL]'} Partitions moved by adding one: {moved}")
+        return all_ok and ok
+    except Exception as e:
+        print(f"[FAIL] Shard planning check failed: {e}")
+        return False
+
 def test_directories():
     """Test required directories"""
     print("\n" + "=" * 60)
@@ -98,6 +460,12 @@ def main():
         "Imports": test_imports(),
         "Database": test_database(),
         "Flask App": test_app(),
+        "Query Counts": test_query_counts(),
+        "Archive": test_archive(),
+        "Face Tracking": test_face_tracking(),
+        "Attendance Marks": test_attendance_marks(),
+        "Recognition Jobs": test_recognition_jobs(),
+        "Shard Planning": test_shard_planning(),
         "Directories": test_directories(),
     }
     